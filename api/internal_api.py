@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from typing import Type, TypeVar, Generic
+from typing import Type, TypeVar, Generic, List, Optional
 from pydantic import BaseModel
 from services.service_registry import ServiceRegistry
 from models.base_models import ErrorResponse
@@ -38,4 +39,63 @@ def call_service(service_name: str, input_data: T) -> R:
         return ErrorResponse(error=str(e))
     except Exception as e:
         logger.error(f"Unexpected error in service {service_name}: {str(e)}")
-        return ErrorResponse(error=f"Internal error: {str(e)}") 
\ No newline at end of file
+        return ErrorResponse(error=f"Internal error: {str(e)}") 
+
+async def call_service_async(service_name: str, input_data: T) -> R:
+    """
+    Call a service with the given input data without blocking the event loop.
+
+    Many calls can be awaited together (e.g. with ``asyncio.gather``) to keep
+    several provider requests in flight from one thread.
+
+    Args:
+        service_name: Name of the service to call
+        input_data: Input data model
+
+    Returns:
+        Response model from the service, or an ErrorResponse
+    """
+    try:
+        service = ServiceRegistry.get(service_name)
+        logger.info(f"Calling service {service_name} asynchronously with input: {input_data}")
+
+        result = await service.process_async(input_data)
+        logger.info(f"Service {service_name} returned: {result}")
+
+        return result
+
+    except ValueError as e:
+        logger.error(f"Service error: {str(e)}")
+        return ErrorResponse(error=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in service {service_name}: {str(e)}")
+        return ErrorResponse(error=f"Internal error: {str(e)}")
+
+def run_sync(coroutine):
+    """
+    Run a coroutine such as ``call_service_async(...)`` from synchronous code.
+
+    Uses a fresh event loop, so it must not be called from inside a running loop.
+    """
+    return asyncio.run(coroutine)
+
+def call_service_batch(service_name: str, inputs: List[T], max_workers: Optional[int] = None) -> List[R]:
+    """
+    Call a service with many inputs at once.
+
+    Args:
+        service_name: Name of the service to call
+        inputs: Input data models
+        max_workers: Cap on the items processed at once (the service's own limit by default)
+
+    Returns:
+        One response model per input, in order; failed items are ErrorResponses
+    """
+    try:
+        service = ServiceRegistry.get(service_name)
+    except ValueError as e:
+        logger.error(f"Service error: {str(e)}")
+        return [ErrorResponse(error=str(e)) for _ in inputs]
+
+    logger.info(f"Calling service {service_name} with a batch of {len(inputs)} inputs")
+    return service.process_batch(inputs, max_workers=max_workers)
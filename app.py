@@ -0,0 +1,216 @@
+import os
+import hmac
+import time
+import logging
+import secrets
+import threading
+from flask import Flask, Response, jsonify, request, stream_with_context
+from pydantic import ValidationError
+from flask_cors import CORS
+from dotenv import load_dotenv
+from automation_runner import build_sync_engine
+from metrics import render_prometheus
+from models.service_models import TextToSpeechRequest
+from services.service_registry import ServiceRegistry
+from webhooks import WebhookDispatcher, DEFAULT_DEBOUNCE_SECONDS, DEFAULT_MAX_DELAY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Longest text /tts/stream synthesizes; every request spends provider credits
+DEFAULT_TTS_MAX_TEXT_CHARS = 5000
+# How long a stream URL handed out by /tts/stream/token can be played
+DEFAULT_STREAM_TOKEN_SECONDS = 60
+
+
+class StreamTokens:
+    """
+    Short-lived tokens standing for validated text-to-speech requests.
+
+    An ``<audio>`` tag can neither send a header nor a body, and a long text
+    does not fit in a URL, so the browser gets a URL holding only a token. A
+    token can be replayed until it expires, since browsers may fetch media more
+    than once. Tokens live in this process's memory.
+    """
+
+    def __init__(self, ttl=DEFAULT_STREAM_TOKEN_SECONDS):
+        self.ttl = ttl
+        self._requests = {}  # token -> (expires at, request)
+        self._lock = threading.Lock()
+
+    def issue(self, tts_request):
+        token = secrets.token_urlsafe(24)
+        now = time.monotonic()
+        with self._lock:
+            self._requests = {key: entry for key, entry in self._requests.items() if entry[0] > now}
+            self._requests[token] = (now + self.ttl, tts_request)
+        return token
+
+    def redeem(self, token):
+        """The request behind a token, or None if it is unknown or expired."""
+        with self._lock:
+            entry = self._requests.get(token)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+
+def create_app(engine=None, tts_service=None):
+    """
+    Create the Flask app serving the sync endpoints.
+
+    Args:
+        engine: Sync engine (a ``CodaAPI`` or ``tenants.MultiTenantSync``) to run triggers
+            against; built from the environment when omitted.
+        tts_service: Text-to-speech service behind ``/tts/stream``; the registered one by default,
+            built on the first request.
+    """
+    load_dotenv()
+    app = Flask(__name__)
+    CORS(app)
+
+    engine = engine or build_sync_engine()
+    dispatcher = WebhookDispatcher(
+        lambda key: _handle_trigger(engine, key),
+        debounce_seconds=float(os.getenv('WEBHOOK_DEBOUNCE_SECONDS', DEFAULT_DEBOUNCE_SECONDS)),
+        max_delay_seconds=float(os.getenv('WEBHOOK_MAX_DELAY_SECONDS', DEFAULT_MAX_DELAY_SECONDS))
+    )
+    app.config['SYNC_ENGINE'] = engine
+    app.config['WEBHOOK_DISPATCHER'] = dispatcher
+    webhook_secret = os.getenv('WEBHOOK_SECRET')
+    tts_max_chars = int(os.getenv('TTS_MAX_TEXT_CHARS', DEFAULT_TTS_MAX_TEXT_CHARS))
+    stream_tokens = StreamTokens(float(os.getenv('TTS_STREAM_TOKEN_SECONDS', DEFAULT_STREAM_TOKEN_SECONDS)))
+
+    def authorized():
+        """Whether the request carries ``WEBHOOK_SECRET`` in ``X-Webhook-Secret``; always true when none is set."""
+        return not webhook_secret or hmac.compare_digest(request.headers.get('X-Webhook-Secret', ''), webhook_secret)
+
+    # Full sync passes only run on the worker (automation_runner.py), which shards clients with its
+    # lease manager and owns the sync state; this app only recounts the clients webhooks name
+    @app.get('/health')
+    def health():
+        return jsonify({'status': 'ok'})
+
+    @app.post('/webhook/client')
+    def client_webhook():
+        """
+        Recount a single client, triggered by a Coda automation.
+
+        Expects a JSON body with either ``row_id`` (the Clients row) or
+        ``student_doc_id``, and optionally the ``tenant`` the client belongs to
+        (the first configured tenant by default). When ``WEBHOOK_SECRET`` is set, the request must carry it
+        in the ``X-Webhook-Secret`` header.
+        """
+        if not authorized():
+            return jsonify({'error': 'Invalid webhook secret'}), 401
+
+        payload = request.get_json(silent=True) or {}
+        row_id = payload.get('row_id')
+        student_doc_id = payload.get('student_doc_id')
+        if not (row_id or student_doc_id):
+            return jsonify({'error': 'Either row_id or student_doc_id is required'}), 400
+        tenant = payload.get('tenant')
+        if tenant and tenant not in getattr(engine, 'engines', {}):
+            return jsonify({'error': f"Unknown tenant '{tenant}'"}), 400
+
+        key = ('row', row_id, tenant) if row_id else ('doc', student_doc_id, tenant)
+        queued = dispatcher.submit(key)
+        return jsonify({'status': 'queued' if queued else 'coalesced'}), 202
+
+    @app.get('/webhook/stats')
+    def webhook_stats():
+        return jsonify(dispatcher.stats())
+
+    def tts_request_from_body():
+        """The ``TextToSpeechRequest`` in the JSON body, or an error response."""
+        if not authorized():
+            return None, (jsonify({'error': 'Invalid webhook secret'}), 401)
+        try:
+            tts_request = TextToSpeechRequest(**(request.get_json(silent=True) or {}))
+        except ValidationError as e:
+            return None, (jsonify({'error': str(e)}), 400)
+        if len(tts_request.text) > tts_max_chars:
+            return None, (jsonify({'error': f"Text longer than {tts_max_chars} characters"}), 413)
+        return tts_request, None
+
+    def stream_response(tts_request):
+        try:
+            chunks = (tts_service or ServiceRegistry.get('text_to_speech')).stream(tts_request)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return Response(
+            stream_with_context(chunks),
+            mimetype='audio/mpeg',
+            # Keep proxies from buffering the stream, which would defeat early playback
+            headers={'Cache-Control': 'no-store', 'X-Accel-Buffering': 'no'}
+        )
+
+    @app.post('/tts/stream')
+    def tts_stream():
+        """
+        Stream synthesized speech as chunked MP3.
+
+        Takes the ``TextToSpeechRequest`` fields as a JSON body and, like the
+        client webhook, the ``WEBHOOK_SECRET``. Audio is sent as the provider
+        produces it.
+        """
+        tts_request, error = tts_request_from_body()
+        return error or stream_response(tts_request)
+
+    @app.post('/tts/stream/token')
+    def tts_stream_token():
+        """
+        Validate a ``/tts/stream`` request and return a short-lived URL that streams it.
+
+        For ``<audio>`` tags, which cannot send the secret or a body: the caller
+        holding the secret (the Streamlit app) asks for the URL and the browser plays it.
+        """
+        tts_request, error = tts_request_from_body()
+        if error:
+            return error
+        token = stream_tokens.issue(tts_request)
+        return jsonify({'url': f"/tts/stream/{token}", 'expires_in': stream_tokens.ttl}), 201
+
+    @app.get('/tts/stream/<token>')
+    def tts_stream_with_token(token):
+        tts_request = stream_tokens.redeem(token)
+        if tts_request is None:
+            return jsonify({'error': 'Unknown or expired stream token'}), 404
+        return stream_response(tts_request)
+
+    @app.get('/metrics')
+    def metrics():
+        """Sync and Coda API metrics in the Prometheus text format."""
+        return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+    return app
+
+
+def _handle_trigger(engine, key):
+    """Run the sync work for a debounced trigger key."""
+    kind, value, tenant = key
+    # A plain CodaAPI engine has a single tenant and takes no tenant argument
+    options = {'tenant': tenant} if tenant else {}
+    if kind == 'row':
+        result = engine.sync_client(row_id=value, **options)
+    else:
+        result = engine.sync_client(student_doc_id=value, **options)
+    summary = {k: v for k, v in result.items() if k not in ('details', 'quarantined_docs')}
+    logger.info(f"Webhook sync for {kind} {value or ''} completed: {summary}")
+
+
+def __getattr__(name):
+    """
+    Build the module-level ``app`` (``gunicorn app:app``) on first access.
+
+    Importing this module (tests, tooling) then never builds a sync engine or
+    creates its state database.
+    """
+    if name == 'app':
+        globals()['app'] = create_app()
+        return globals()['app']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if __name__ == '__main__':
+    create_app().run(host='0.0.0.0', port=int(os.getenv('PORT', 8000)))
@@ -1,9 +1,18 @@
 import os
+import json
 import time
-import schedule
 import logging
 from dotenv import load_dotenv
-from coda_api import CodaAPI
+from coda_api import CodaAPI, DEFAULT_MAX_WORKERS, DEFAULT_COUNT_STRATEGY, DEFAULT_PAGE_SIZE, DEFAULT_MAX_SAMPLES
+from sync_state import SyncStateStore, DEFAULT_STATE_PATH
+from rate_limiter import get_shared_rate_limiter
+from coda_client import CodaClient, connection_stats
+from tenants import MultiTenantSync, TenantAudio, load_tenants
+from pregeneration import AudioPregenerator, DEFAULT_PREGEN_WORKERS, DEFAULT_MAX_QUEUED, DEFAULT_MAX_ATTEMPTS
+from metrics import REGISTRY, start_http_server
+from circuit_breaker import DocCircuitBreaker, DEFAULT_FAILURE_THRESHOLD, DEFAULT_BASE_COOLOFF, DEFAULT_MAX_COOLOFF
+from leases import LeaseManager, DEFAULT_LEASE_SECONDS
+from scheduler import SyncScheduler, PollingPolicy, DEFAULT_MIN_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL
 
 # Configure logging
 logging.basicConfig(
@@ -12,13 +21,104 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_automation():
+# Seconds between the starts of two sync passes
+DEFAULT_SYNC_INTERVAL = 60
+# With webhooks pushing single-client recounts, the full poll only reconciles missed triggers
+DEFAULT_RECONCILE_INTERVAL = 15 * 60
+
+def build_lease_manager(interval):
+    """
+    Create the lease manager when sharding is configured (``SYNC_LEASE_DB``), else None.
+
+    Leases must outlive the gap between two passes, or a healthy worker would
+    look dead to its peers.
+    """
+    lease_db = os.getenv('SYNC_LEASE_DB')
+    if not lease_db:
+        return None
+    lease_seconds = float(os.getenv('SYNC_LEASE_SECONDS', max(DEFAULT_LEASE_SECONDS, 3 * interval)))
+    return LeaseManager(lease_db, worker_id=os.getenv('SYNC_WORKER_ID'), lease_seconds=lease_seconds)
+
+def build_sync_engine(lease_manager=None):
+    """
+    Create the sync engine from environment settings.
+
+    The engine is built once per process and reused by every scheduled run, so
+    its Coda connection pool and sync state stay warm between runs. It syncs
+    every tenant listed in ``SYNC_TENANTS_FILE`` (the original Clients table
+    when unset) through one Coda client, so they share one rate budget.
+    With ``SYNC_PREGENERATE_AUDIO``, tenants with an ``audio`` config get the
+    audio of their new and changed sentences synthesized in the background.
+    """
+    max_workers = int(os.getenv('SYNC_MAX_WORKERS', DEFAULT_MAX_WORKERS))
+    client = CodaClient(os.getenv('CODA_API_TOKEN'), pool_size=max_workers)
+    state_store = SyncStateStore(os.getenv('SYNC_STATE_PATH', DEFAULT_STATE_PATH))
+    settings = dict(
+        max_workers=max_workers,
+        client=client,
+        count_strategy=os.getenv('SYNC_COUNT_STRATEGY', DEFAULT_COUNT_STRATEGY),
+        page_size=int(os.getenv('SYNC_PAGE_SIZE', DEFAULT_PAGE_SIZE)),
+        # Per-client sync state lives on disk so restarts keep skipping unchanged docs
+        state_store=state_store,
+        polling_policy=PollingPolicy(
+            min_interval=float(os.getenv('SYNC_MIN_POLL_SECONDS', DEFAULT_MIN_POLL_INTERVAL)),
+            max_interval=float(os.getenv('SYNC_MAX_POLL_SECONDS', DEFAULT_MAX_POLL_INTERVAL))
+        ),
+        lease_manager=lease_manager,
+        # A long-running worker only needs counters and a few failed rows, not every row of every pass
+        detail_level=os.getenv('SYNC_DETAIL_LEVEL', 'errors'),
+        max_samples=int(os.getenv('SYNC_MAX_SAMPLES', DEFAULT_MAX_SAMPLES)),
+        circuit_breaker=DocCircuitBreaker(
+            state_store,
+            threshold=int(os.getenv('SYNC_QUARANTINE_THRESHOLD', DEFAULT_FAILURE_THRESHOLD)),
+            base_cooloff=float(os.getenv('SYNC_QUARANTINE_BASE_SECONDS', DEFAULT_BASE_COOLOFF)),
+            max_cooloff=float(os.getenv('SYNC_QUARANTINE_MAX_SECONDS', DEFAULT_MAX_COOLOFF))
+        )
+    )
+    tenants = load_tenants(os.getenv('SYNC_TENANTS_FILE'))
+    if os.getenv('SYNC_PREGENERATE_AUDIO', '').lower() in ('1', 'true', 'yes'):
+        settings['pregenerator'] = AudioPregenerator(
+            state_store,
+            workers=int(os.getenv('SYNC_PREGENERATE_WORKERS', DEFAULT_PREGEN_WORKERS)),
+            max_queued=int(os.getenv('SYNC_PREGENERATE_MAX_QUEUED', DEFAULT_MAX_QUEUED)),
+            max_attempts=int(os.getenv('SYNC_PREGENERATE_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS))
+        )
+        sentence_column = os.getenv('SYNC_AUDIO_SENTENCE_COLUMN')
+        if sentence_column:
+            # The same sentences table layout for tenants whose config has no audio section
+            audio = TenantAudio(
+                sentence_column=sentence_column,
+                language_column=os.getenv('SYNC_AUDIO_LANGUAGE_COLUMN'),
+                **({'language_code': os.environ['SYNC_AUDIO_LANGUAGE']} if os.getenv('SYNC_AUDIO_LANGUAGE') else {})
+            )
+            tenants = [tenant if tenant.audio else tenant.model_copy(update={'audio': audio}) for tenant in tenants]
+    return MultiTenantSync([CodaAPI(None, tenant=tenant, **settings) for tenant in tenants])
+
+def run_automation(coda):
     """Run the sentence count sync automation."""
     try:
         logger.info("Starting automation run...")
-        coda = CodaAPI(os.getenv('CODA_API_TOKEN'))
         result = coda.sync_clients_sentence_counts()
-        logger.info(f"Automation completed. Results: {result}")
+        summary = {k: v for k, v in result.items() if k not in ('details', 'quarantined_docs')}
+        logger.info(f"Automation completed with {coda.max_workers} workers. Results: {summary}")
+        for detail in result['details']:
+            if 'error' in detail:
+                logger.warning(f"Row {detail['row_id']} failed: {detail['error']}")
+        # One JSON line per pass, for log-based dashboards without a Prometheus scraper
+        logger.info(f"sync_metrics {json.dumps(REGISTRY.snapshot(), sort_keys=True)}")
+        logger.info(f"Coda rate limiter: {get_shared_rate_limiter().stats()}")
+        logger.info(f"Coda connections: {connection_stats()}")
+        if coda.lease_manager:
+            logger.info(f"Leases: {coda.lease_manager.stats()}")
+        if coda.pregenerator:
+            logger.info(f"Audio pre-generation: {coda.pregenerator.stats()}")
+        if result['rows_quarantined']:
+            logger.warning(f"{result['rows_quarantined']} clients skipped, their docs are quarantined, e.g. "
+                           f"{[q['student_doc_id'] for q in result['quarantined_docs']]}")
+
+        next_due = [due for due in coda.next_due_times().values() if due is not None]
+        if next_due:
+            logger.info(f"{len(next_due)} clients scheduled; next one due in {max(0.0, min(next_due) - time.time()):.0f}s")
     except Exception as e:
         logger.error(f"Error in automation run: {str(e)}")
 
@@ -27,25 +127,27 @@ def main():
     # Load environment variables
     load_dotenv()
     
-    # Schedule the automation to run every minute
-    schedule.every(1).minutes.do(run_automation)
-    
-    # Run the automation immediately on startup
-    run_automation()
-    
-    logger.info("Automation scheduler started. Running every minute...")
-    
-    # Keep the script running
-    while True:
-        try:
-            schedule.run_pending()
-            time.sleep(1)
-        except KeyboardInterrupt:
-            logger.info("Automation scheduler stopped by user")
-            break
-        except Exception as e:
-            logger.error(f"Error in scheduler: {str(e)}")
-            time.sleep(60)  # Wait a minute before retrying
+    webhooks_enabled = os.getenv('SYNC_WEBHOOKS_ENABLED', '').lower() in ('1', 'true', 'yes')
+    default_interval = DEFAULT_RECONCILE_INTERVAL if webhooks_enabled else DEFAULT_SYNC_INTERVAL
+    interval = float(os.getenv('SYNC_INTERVAL_SECONDS', default_interval))
+
+    metrics_port = os.getenv('SYNC_METRICS_PORT')
+    if metrics_port:
+        start_http_server(int(metrics_port))
+
+    lease_manager = build_lease_manager(interval)
+    coda = build_sync_engine(lease_manager)
+
+    # Passes run back to back and never overlap; the first one starts immediately
+    scheduler = SyncScheduler(lambda: run_automation(coda), interval=interval)
+
+    logger.info(f"Automation scheduler started. Running every {interval:.0f}s...")
+    try:
+        scheduler.run_forever()
+    finally:
+        # Let the other workers take over this worker's rows right away
+        if lease_manager:
+            lease_manager.release_all()
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
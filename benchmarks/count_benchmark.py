@@ -0,0 +1,54 @@
+"""
+Compare sentence counting strategies on large tables.
+
+'full' is the original approach of downloading every row before taking ``len``;
+'metadata' and 'stream' are the strategies selectable on ``CodaAPI``.
+
+Usage:
+    python -m benchmarks.count_benchmark --rows 50000 --page-size 200
+"""
+import argparse
+import time
+import tracemalloc
+
+from coda_api import CodaAPI
+from benchmarks.fake_coda import FakeCoda
+
+
+def measure(label, count_fn, fake):
+    """Run ``count_fn`` once and print its result, duration, calls and peak memory."""
+    fake.calls.clear()
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = count_fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>9}: count={count} time={elapsed * 1000:.1f}ms "
+          f"calls={sum(fake.calls.values())} peak_mem={peak / 1024:.0f}KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--page-size', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0, help="Simulated seconds per Coda call")
+    args = parser.parse_args()
+
+    fake = FakeCoda(latency=args.latency)
+    fake.add_table("doc-big", "grid-sentences", [
+        {"id": f"i-{i}", "values": {"c-text": f"Sentence number {i} with some text", "c-lang": "fr-FR"}}
+        for i in range(args.rows)
+    ])
+
+    metadata = CodaAPI(api_token=None, client=fake, count_strategy='metadata')
+    stream = CodaAPI(api_token=None, client=fake, count_strategy='stream', page_size=args.page_size)
+
+    print(f"rows={args.rows} page_size={args.page_size}")
+    measure('full', lambda: len(fake.list_rows("doc-big", "grid-sentences")["items"]), fake)
+    measure('metadata', lambda: metadata._count_sentences("doc-big", "grid-sentences"), fake)
+    measure('stream', lambda: stream._count_sentences("doc-big", "grid-sentences"), fake)
+
+
+if __name__ == '__main__':
+    main()
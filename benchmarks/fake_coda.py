@@ -0,0 +1,194 @@
+"""
+In-memory stand-in for the Coda client used by the sync benchmarks.
+
+It mimics the subset of the client surface that ``CodaAPI`` relies on and adds a
+fixed per-call latency so concurrency effects show up in wall-clock numbers.
+"""
+import json
+import threading
+import time
+from collections import Counter
+
+from coda_api import CodaAPI
+from coda_client import CodaClient, CodaAPIError
+
+MAIN_DOC_ID = "9omNdUhI4j"
+CLIENTS_TABLE_ID = "grid-PZqFjHZRk_"
+
+
+class FakeCoda(CodaClient):
+    """
+    A thread-safe fake Coda client backed by plain dictionaries.
+
+    The HTTP-level methods are replaced; pagination helpers such as ``iter_rows``
+    are inherited from ``CodaClient`` and run unchanged on top of ``list_rows``.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.tables = {}  # (doc_id, table_id) -> list of row dicts
+        self.doc_versions = {}  # doc_id -> updatedAt
+        self.row_versions = {}  # (doc_id, table_id, row_id) -> change sequence number, for sync tokens
+        self._sequence = 0
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def _tick(self, name):
+        with self._lock:
+            self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def add_table(self, doc_id, table_id, rows):
+        self.tables[(doc_id, table_id)] = rows
+        for row in rows:
+            self._bump(doc_id, table_id, row["id"])
+        self.touch(doc_id)
+
+    def _bump(self, doc_id, table_id, row_id):
+        with self._lock:
+            self._sequence += 1
+            self.row_versions[(doc_id, table_id, row_id)] = self._sequence
+
+    def edit_row(self, doc_id, table_id, row_id, values):
+        """Change or add a row's cells as a user editing the doc would."""
+        rows = self.tables[(doc_id, table_id)]
+        row = next((row for row in rows if row["id"] == row_id), None)
+        if row is None:
+            row = {"id": row_id, "values": {}}
+            rows.append(row)
+        row["values"].update(values)
+        self._bump(doc_id, table_id, row_id)
+        self.touch(doc_id)
+
+    def touch(self, doc_id):
+        """Bump a doc's updatedAt, as any edit in Coda would."""
+        with self._lock:
+            self.doc_versions[doc_id] = f"2024-01-01T00:00:{len(self.doc_versions) + time.time():.6f}Z"
+
+    def list_docs(self, limit=None, page_token=None):
+        self._tick('list_docs')
+        docs = [{"id": doc_id, "updatedAt": updated_at} for doc_id, updated_at in sorted(self.doc_versions.items())]
+        start = int(page_token or 0)
+        end = start + (limit or len(docs))
+        page = {"items": docs[start:end]}
+        if end < len(docs):
+            page["nextPageToken"] = str(end)
+        return page
+
+    def _rows(self, doc_id, table_id_or_name):
+        rows = self.tables.get((doc_id, table_id_or_name))
+        if rows is None:
+            raise CodaAPIError(404, f"Table {table_id_or_name} not found in doc {doc_id}")
+        return rows
+
+    def get_table(self, doc_id, table_id_or_name):
+        self._tick('get_table')
+        rows = self._rows(doc_id, table_id_or_name)
+        return {"id": table_id_or_name, "rowCount": len(rows)}
+
+    def get_row(self, doc_id, table_id_or_name, row_id_or_name):
+        self._tick('get_row')
+        for row in self._rows(doc_id, table_id_or_name):
+            if row["id"] == row_id_or_name:
+                return json.loads(json.dumps(row))
+        raise CodaAPIError(404, f"Row {row_id_or_name} not found")
+
+    def list_rows(self, doc_id, table_id_or_name, limit=None, page_token=None, value_format=None, query=None,
+                  sync_token=None):
+        self._tick('list_rows')
+        rows = self._rows(doc_id, table_id_or_name)
+        # Page tokens are "<offset>" or "<offset>/<sync token>", so later pages keep the first page's filter
+        if page_token and "/" in page_token:
+            page_token, sync_token = page_token.split("/", 1)
+        with self._lock:
+            sequence = self._sequence
+            if sync_token:
+                rows = [row for row in rows
+                        if self.row_versions.get((doc_id, table_id_or_name, row["id"]), 0) > int(sync_token)]
+        if query:
+            column, value = query.split(":", 1)
+            rows = [row for row in rows if row["values"].get(column) == json.loads(value)]
+        if not (limit or page_token):
+            # Round-trip through JSON so memory use resembles a decoded HTTP response
+            return json.loads(json.dumps({"items": rows}))
+
+        start = int(page_token or 0)
+        end = start + (limit or len(rows))
+        page = {"items": rows[start:end]}
+        if end < len(rows):
+            page["nextPageToken"] = f"{end}/{sync_token}" if sync_token else str(end)
+        else:
+            page["nextSyncToken"] = str(sequence)
+        return json.loads(json.dumps(page))
+
+    def update_row(self, doc_id, table_id_or_name, row_id_or_name, data):
+        self._tick('update_row')
+        with self._lock:
+            for row in self.tables[(doc_id, table_id_or_name)]:
+                if row["id"] == row_id_or_name:
+                    for cell in data["row"]["cells"]:
+                        row["values"][cell["column"]] = cell["value"]
+                    return {"id": row_id_or_name}
+        raise Exception(f"Row {row_id_or_name} not found")
+
+    def upsert_row(self, doc_id, table_id_or_name, data):
+        self._tick('upsert_row')
+        key_columns = data.get("keyColumns", [])
+        added = []
+        with self._lock:
+            rows = self.tables[(doc_id, table_id_or_name)]
+            for new_row in data["rows"]:
+                cells = {cell["column"]: cell["value"] for cell in new_row["cells"]}
+                matches = [
+                    row for row in rows
+                    if key_columns and all(row["values"].get(k) == cells.get(k) for k in key_columns)
+                ]
+                if not matches:
+                    matches = [{"id": f"i-new{len(rows)}", "values": {}}]
+                    rows.append(matches[0])
+                    added.append(matches[0]["id"])
+                for row in matches:
+                    row["values"].update(cells)
+            self._sequence += 1
+            request_id = f"fake-request-{self._sequence}"
+        # Like Coda, inserted rows are only listed for upserts without key columns
+        return {"requestId": request_id, "addedRowIds": added} if not key_columns else {"requestId": request_id}
+
+    def get_mutation_status(self, request_id):
+        self._tick('get_mutation_status')
+        # Writes are applied before they return
+        return {"completed": True}
+
+    def delete_row(self, doc_id, table_id_or_name, row_id_or_name):
+        self._tick('delete_row')
+        with self._lock:
+            rows = self.tables[(doc_id, table_id_or_name)]
+            rows[:] = [row for row in rows if row["id"] != row_id_or_name]
+        return {"id": row_id_or_name}
+
+
+def build_fake(num_clients, sentences_per_client=25, latency=0.0):
+    """Create a fake Clients table with ``num_clients`` student docs."""
+    fake = FakeCoda(latency=latency)
+    api = CodaAPI(api_token=None, client=fake)
+
+    clients = []
+    for i in range(num_clients):
+        doc_id = f"doc-{i:05d}"
+        table_id = f"grid-sentences-{i:05d}"
+        clients.append({
+            "id": f"i-{i:05d}",
+            "values": {
+                api.COL_FIRST_NAME: f"Student {i}",
+                api.COL_CLIENT_DOC_ID: doc_id,
+                api.COL_SENTENCES_TABLE: table_id,
+                api.COL_NUM_SENTENCES: 0,
+            }
+        })
+        fake.add_table(doc_id, table_id, [
+            {"id": f"i-s{j}", "values": {"c-text": f"Sentence {j}"}}
+            for j in range(sentences_per_client + i % 7)
+        ])
+    fake.add_table(MAIN_DOC_ID, CLIENTS_TABLE_ID, clients)
+    return fake
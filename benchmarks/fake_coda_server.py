@@ -0,0 +1,198 @@
+"""
+Local HTTP stand-in for the Coda API, backed by ``FakeCoda``.
+
+Implements the endpoints the sync engine uses (list docs, table metadata, list
+rows with pagination, get/update/delete row, upsert and mutation status) with
+configurable latency, error rate and 429 injection, over a synthetic Clients
+table of student docs.
+Point the engine at it with ``CODA_API_BASE_URL=http://127.0.0.1:<port>``.
+
+Usage:
+    python -m benchmarks.fake_coda_server --clients 2000 --port 8765 --latency 0.02 --throttle-rate 0.01
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+from coda_client import CodaAPIError, DEFAULT_PAGE_SIZE
+from benchmarks.fake_coda import build_fake
+
+_TABLE = r"/docs/(?P<doc>[^/]+)/tables/(?P<table>[^/]+)"
+ROUTES = [
+    ('GET', re.compile(r"^/docs$"), 'list_docs'),
+    ('GET', re.compile(f"^{_TABLE}$"), 'get_table'),
+    ('GET', re.compile(f"^{_TABLE}/rows$"), 'list_rows'),
+    ('POST', re.compile(f"^{_TABLE}/rows$"), 'upsert_row'),
+    ('GET', re.compile(f"^{_TABLE}/rows/(?P<row>[^/]+)$"), 'get_row'),
+    ('PUT', re.compile(f"^{_TABLE}/rows/(?P<row>[^/]+)$"), 'update_row'),
+    ('DELETE', re.compile(f"^{_TABLE}/rows/(?P<row>[^/]+)$"), 'delete_row'),
+    ('GET', re.compile(r"^/mutationStatus/(?P<request>[^/]+)$"), 'get_mutation_status'),
+]
+
+
+class FakeCodaServer(ThreadingHTTPServer):
+    """HTTP server exposing a ``FakeCoda`` store with injected latency and failures."""
+
+    daemon_threads = True
+
+    def __init__(self, address, fake, latency=0.0, error_rate=0.0, throttle_rate=0.0, retry_after=1):
+        super().__init__(address, FakeCodaHandler)
+        self.fake = fake
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self.requests[name] += 1
+
+
+class FakeCodaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, Nagle's algorithm
+    # adds ~40ms to every keep-alive response and swamps the configured latency
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=None, headers=None):
+        payload = json.dumps(body if body is not None else {}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _body(self):
+        return json.loads(self._raw_body) if self._raw_body else {}
+
+    def _handle(self, method):
+        server = self.server
+        url = urlparse(self.path)
+        # Read the whole request before any response, even an early 429/503/404; unread body
+        # bytes would otherwise be parsed as the next request on the keep-alive connection
+        self._raw_body = self._read_body()
+
+        # Control endpoints for benchmark drivers; not part of the Coda API
+        if url.path == '/_stats':
+            return self._send(200, dict(server.requests))
+        if url.path == '/_reset':
+            server.requests.clear()
+            return self._send(200)
+
+        for route_method, pattern, name in ROUTES:
+            match = pattern.match(url.path) if route_method == method else None
+            if match:
+                break
+        else:
+            return self._send(404, {'message': f"No route for {method} {url.path}"})
+
+        server.count(name)
+        server.count('total')
+        if server.latency:
+            time.sleep(server.latency)
+        if server.throttle_rate and random.random() < server.throttle_rate:
+            server.count('throttled')
+            return self._send(429, {'message': 'Too many requests'}, {'Retry-After': server.retry_after})
+        if server.error_rate and random.random() < server.error_rate:
+            server.count('errors')
+            return self._send(503, {'message': 'Injected failure'})
+
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        args = {key: unquote(value) for key, value in match.groupdict().items()}
+        fake = server.fake
+        try:
+            if name == 'list_docs':
+                result = fake.list_docs(limit=int(params.get('limit', DEFAULT_PAGE_SIZE)), page_token=params.get('pageToken'))
+            elif name == 'get_table':
+                result = fake.get_table(args['doc'], args['table'])
+            elif name == 'list_rows':
+                # Like the real API, an unbounded request still gets a single page
+                result = fake.list_rows(
+                    args['doc'], args['table'],
+                    limit=int(params.get('limit', DEFAULT_PAGE_SIZE)),
+                    page_token=params.get('pageToken'),
+                    value_format=params.get('valueFormat'),
+                    query=params.get('query')
+                )
+            elif name == 'get_row':
+                result = fake.get_row(args['doc'], args['table'], args['row'])
+            elif name == 'update_row':
+                result = fake.update_row(args['doc'], args['table'], args['row'], self._body())
+            elif name == 'delete_row':
+                result = fake.delete_row(args['doc'], args['table'], args['row'])
+            elif name == 'get_mutation_status':
+                result = fake.get_mutation_status(args['request'])
+            else:
+                result = fake.upsert_row(args['doc'], args['table'], self._body())
+        except CodaAPIError as e:
+            return self._send(e.status_code, {'message': str(e)})
+        except Exception as e:
+            return self._send(404, {'message': str(e)})
+
+        self._send(202 if method in ('PUT', 'POST', 'DELETE') else 200, result)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+def start_server(num_clients=2000, sentences_per_client=25, port=0, **options):
+    """Start a server on a background thread and return it; its URL is ``http://127.0.0.1:<server_port>``."""
+    server = FakeCodaServer(('127.0.0.1', port), build_fake(num_clients, sentences_per_client), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--sentences', type=int, default=25, help="Base sentences per student table")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds added to every request")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument('--retry-after', type=float, default=1, help="Retry-After seconds sent with 429s")
+    args = parser.parse_args()
+
+    server = FakeCodaServer(
+        ('127.0.0.1', args.port),
+        build_fake(args.clients, args.sentences),
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after
+    )
+    print(f"Fake Coda API with {args.clients} clients on http://127.0.0.1:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
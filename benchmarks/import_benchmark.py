@@ -0,0 +1,68 @@
+"""
+Measure the cold-start cost of the service registry.
+
+Each measurement runs in a fresh interpreter, so nothing is already imported:
+'lazy' imports the registry and lists the services, as a Streamlit rerun or a
+worker boot does; 'first get' then builds the text-to-speech service; 'eager'
+imports the text-to-speech module and builds the service up front, which is
+what importing the registry used to cost.
+
+Usage:
+    python -m benchmarks.import_benchmark --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = {
+    'lazy': (
+        "from services.service_registry import ServiceRegistry\n"
+        "ServiceRegistry.list_services()\n"
+    ),
+    'first get': (
+        "from services.service_registry import ServiceRegistry\n"
+        "ServiceRegistry.list_services()\n"
+        "ServiceRegistry.get('text_to_speech')\n"
+    ),
+    'eager': (
+        "from services.text_to_speech_service import TextToSpeechService\n"
+        "TextToSpeechService()\n"
+    ),
+}
+
+TIMER = (
+    "import sys, time, json\n"
+    "started = time.perf_counter()\n"
+    "{code}"
+    "print(json.dumps([time.perf_counter() - started, len(sys.modules)]))\n"
+)
+
+
+def measure(code):
+    """Seconds taken by ``code`` and modules loaded, in a fresh interpreter."""
+    # No credentials or cache, so no network calls or disk scans skew the numbers
+    env = {k: v for k, v in os.environ.items() if k not in ('ELEVENLABS_API_KEY', 'GOOGLE_APPLICATION_CREDENTIALS')}
+    env['TTS_CACHE_DISABLED'] = '1'
+    output = subprocess.run([sys.executable, '-c', TIMER.format(code=code)], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"runs={args.runs} (median)")
+    for label, code in SCENARIOS.items():
+        runs = [measure(code) for _ in range(args.runs)]
+        seconds = statistics.median(run[0] for run in runs)
+        modules = runs[0][1]
+        print(f"{label:>9}: time={seconds * 1000:.1f}ms modules={modules}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Sync throughput benchmark suite, run over HTTP against the local fake Coda server.
+
+Each scenario starts a fresh fake server with a synthetic Clients table in a
+subprocess, runs several full passes of ``CodaAPI.sync_clients_sentence_counts``
+and reports passes/sec, API calls per pass, p50/p99 per-client latency and the
+engine's peak traced memory. Compare the numbers (or the ``--json`` output)
+before and after a change to the sync engine to spot regressions.
+
+Usage:
+    python -m benchmarks.run_benchmarks --clients 1000 --latency 0.005 --passes 3
+    python -m benchmarks.run_benchmarks --scenarios concurrent incremental --json
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import requests
+
+from coda_api import CodaAPI
+from coda_client import CodaClient
+from rate_limiter import RateLimiter
+from sync_state import SyncStateStore
+
+SCENARIOS = {
+    'sequential': {'max_workers': 1, 'count_strategy': 'metadata'},
+    'concurrent': {'max_workers': 8, 'count_strategy': 'metadata'},
+    'concurrent-stream': {'max_workers': 8, 'count_strategy': 'stream'},
+    'incremental': {'max_workers': 8, 'count_strategy': 'metadata', 'state_store': True},
+}
+
+
+class TimedCodaAPI(CodaAPI):
+    """CodaAPI that records how long each client row takes to count."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.row_latencies = []
+
+    def _count_client_row(self, row, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super()._count_client_row(row, **kwargs)
+        finally:
+            self.row_latencies.append(time.perf_counter() - started)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def start_fake_server(args):
+    """Launch the fake server in a subprocess so its memory is not traced; returns (process, base_url)."""
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'benchmarks.fake_coda_server',
+            '--clients', str(args.clients),
+            '--port', '0',
+            '--latency', str(args.latency),
+            '--error-rate', str(args.error_rate),
+            '--throttle-rate', str(args.throttle_rate),
+            '--retry-after', str(args.retry_after)
+        ],
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    banner = process.stdout.readline()
+    return process, banner.strip().rsplit(' ', 1)[-1]
+
+
+def run_scenario(name, options, args):
+    process, base_url = start_fake_server(args)
+    try:
+        options = dict(options)
+        client = CodaClient(
+            'benchmark-token',
+            base_url=base_url,
+            rate_limiter=RateLimiter(read_rate=args.read_rate, write_rate=args.write_rate),
+            pool_size=options['max_workers']
+        )
+        if options.pop('state_store', False):
+            options['state_store'] = SyncStateStore(":memory:")
+        engine = TimedCodaAPI(api_token=None, client=client, **options)
+
+        requests.get(f"{base_url}/_reset")
+        started = time.perf_counter()
+        errors = 0
+        for _ in range(args.passes):
+            errors += engine.sync_clients_sentence_counts()['errors']
+        elapsed = time.perf_counter() - started
+        server_stats = requests.get(f"{base_url}/_stats").json()
+        latencies = list(engine.row_latencies)
+
+        # One extra pass under tracemalloc, kept out of the timings above
+        tracemalloc.start()
+        engine.sync_clients_sentence_counts()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        process.terminate()
+        process.wait()
+
+    return {
+        'scenario': name,
+        'passes_per_sec': round(args.passes / elapsed, 3),
+        'seconds_per_pass': round(elapsed / args.passes, 3),
+        'api_calls_per_pass': round(server_stats.get('total', 0) / args.passes, 1),
+        'throttled_per_pass': round(server_stats.get('throttled', 0) / args.passes, 1),
+        'p50_client_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p99_client_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'peak_memory_kib': round(peak / 1024),
+        'row_errors': errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--passes', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.005, help="Seconds the fake server adds to every request")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=float, default=1)
+    parser.add_argument('--read-rate', type=float, default=10000, help="Client-side read budget per second")
+    parser.add_argument('--write-rate', type=float, default=10000, help="Client-side write budget per second")
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [run_scenario(name, SCENARIOS[name], args) for name in args.scenarios]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    columns = list(results[0])
+    print(f"clients={args.clients} passes={args.passes} latency={args.latency}s "
+          f"error_rate={args.error_rate} throttle_rate={args.throttle_rate}")
+    print("  ".join(f"{column:>18}" for column in columns))
+    for result in results:
+        print("  ".join(f"{str(result[column]):>18}" for column in columns))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import time
+import threading
+import logging
+from coda_client import is_retryable
+from metrics import QUARANTINED_DOCS
+
+logger = logging.getLogger(__name__)
+
+# Consecutive permanent failures of a student doc before it is quarantined
+DEFAULT_FAILURE_THRESHOLD = 2
+# First quarantine period; it doubles with every further failure, up to the maximum
+DEFAULT_BASE_COOLOFF = 15 * 60
+DEFAULT_MAX_COOLOFF = 24 * 60 * 60
+
+
+def is_permanent_failure(error):
+    """
+    Whether a counting failure will keep happening until someone fixes the doc.
+
+    Deleted docs, revoked permissions and bad table ids fail the same way every
+    pass; throttling and server errors are transient and already retried by the
+    client, so they never trip the breaker (an outage must not quarantine everyone).
+    """
+    return isinstance(error, str) or not is_retryable(error)
+
+
+class DocCircuitBreaker:
+    """
+    Quarantines student docs that keep failing, with exponential cool-off.
+
+    After ``threshold`` consecutive permanent failures, a doc is left alone for
+    ``base_cooloff`` seconds, then tried once more; each further failure doubles
+    the cool-off up to ``max_cooloff``, and a single success closes the breaker.
+    With a ``SyncStateStore``, failures are persisted so restarts keep honoring
+    quarantines.
+    """
+
+    def __init__(self, store=None, threshold=DEFAULT_FAILURE_THRESHOLD, base_cooloff=DEFAULT_BASE_COOLOFF,
+                 max_cooloff=DEFAULT_MAX_COOLOFF):
+        self.store = store
+        self.threshold = max(1, int(threshold))
+        self.base_cooloff = base_cooloff
+        self.max_cooloff = max(base_cooloff, max_cooloff)
+        self._lock = threading.Lock()
+        # student_doc_id -> {'failures', 'last_error', 'quarantined_until'}
+        self._docs = store.load_doc_failures() if store else {}
+        QUARANTINED_DOCS.set(self._quarantined_count(time.time()))
+
+    def cooloff(self, failures):
+        """Quarantine length after ``failures`` consecutive failures (0 below the threshold)."""
+        if failures < self.threshold:
+            return 0
+        return min(self.max_cooloff, self.base_cooloff * 2 ** (failures - self.threshold))
+
+    def quarantined_until(self, doc_id, now=None):
+        """When the doc's quarantine ends, or None if it may be synced now."""
+        with self._lock:
+            entry = self._docs.get(doc_id)
+        until = entry and entry['quarantined_until']
+        if until and until > (now or time.time()):
+            return until
+        return None
+
+    def record_failure(self, doc_id, error):
+        """Count a failure of ``doc_id``. Returns the quarantine end time if the doc is now quarantined."""
+        if not doc_id or not is_permanent_failure(error):
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._docs.setdefault(doc_id, {'failures': 0, 'last_error': None, 'quarantined_until': None})
+            entry['failures'] += 1
+            entry['last_error'] = str(error)
+            cooloff = self.cooloff(entry['failures'])
+            entry['quarantined_until'] = now + cooloff if cooloff else None
+            snapshot = dict(entry)
+            QUARANTINED_DOCS.set(self._quarantined_count(now))
+        if self.store:
+            self.store.save_doc_failure(doc_id, snapshot['failures'], snapshot['last_error'],
+                                        snapshot['quarantined_until'])
+        if cooloff:
+            logger.warning(f"Doc {doc_id} failed {snapshot['failures']} times, quarantined for {cooloff:.0f}s: {error}")
+        return snapshot['quarantined_until']
+
+    def record_success(self, doc_id):
+        """Close the breaker for ``doc_id`` after a successful count."""
+        with self._lock:
+            if self._docs.pop(doc_id, None) is None:
+                return
+            QUARANTINED_DOCS.set(self._quarantined_count(time.time()))
+        if self.store:
+            self.store.clear_doc_failure(doc_id)
+        logger.info(f"Doc {doc_id} synced again, breaker closed")
+
+    def _quarantined_count(self, now):
+        return sum(1 for entry in self._docs.values() if (entry['quarantined_until'] or 0) > now)
+
+    def quarantined(self):
+        """Currently quarantined docs, keyed by doc id."""
+        now = time.time()
+        with self._lock:
+            return {
+                doc_id: dict(entry) for doc_id, entry in self._docs.items()
+                if (entry['quarantined_until'] or 0) > now
+            }
+
+    def stats(self):
+        with self._lock:
+            tracked = len(self._docs)
+            quarantined = self._quarantined_count(time.time())
+        return {'failing_docs': tracked, 'quarantined_docs': quarantined}
@@ -1,7 +1,14 @@
 import os
 from dotenv import load_dotenv
-from codaio import Coda
+import json
+import time
 import logging
+from collections import Counter
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from coda_client import CodaClient, CodaAPIError, DEFAULT_PAGE_SIZE
+from tenants import DEFAULT_TENANT
+from metrics import PASS_SECONDS, LAST_PASS_SECONDS, CLIENTS_FETCH_SECONDS, CLIENT_COUNT_SECONDS, WRITE_SECONDS, ROWS
 
 # Configure logging
 logging.basicConfig(
@@ -10,109 +17,650 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Default size of the worker pool used to fan out per-client syncs
+DEFAULT_MAX_WORKERS = 8
+
+# Rows per bulk upsert request; keeps each payload well under Coda's request size limit
+DEFAULT_UPSERT_BATCH_SIZE = 100
+# How long to wait for upserts to be applied before checking for re-created rows, and how often to poll
+MUTATION_TIMEOUT_SECONDS = 60
+MUTATION_POLL_SECONDS = 1
+
+# How sentence tables are counted:
+#   'metadata' - read rowCount from the table metadata endpoint, streaming if it is unavailable
+#   'stream'   - page through the rows, holding at most one page in memory
+COUNT_STRATEGIES = ('metadata', 'stream')
+DEFAULT_COUNT_STRATEGY = 'metadata'
+
+# How much per-row output a results dict keeps:
+#   'full'   - every row outcome in ``details`` (grows with the Clients table)
+#   'errors' - only a capped sample of failed rows in ``details``
+#   'none'   - aggregate counters only
+DETAIL_LEVELS = ('full', 'errors', 'none')
+DEFAULT_DETAIL_LEVEL = 'full'
+# Rows kept in ``details`` and ``quarantined_docs`` below the 'full' detail level
+DEFAULT_MAX_SAMPLES = 20
+
+# Metadata errors that a streaming count would hit again, so there is no point falling back
+_NON_RECOVERABLE_STATUSES = (401, 403, 404)
+
 class CodaAPI:
-    def __init__(self, api_token):
-        self.coda = Coda(api_key=api_token)
-        
-        # Constants for the main Clients table
-        self.MAIN_DOC_ID = "9omNdUhI4j"           # Main document ID containing the Clients table
-        self.CLIENTS_TABLE_ID = "grid-PZqFjHZRk_"   # Clients table ID
+    def __init__(self, api_token, max_workers=1, client=None, batch_writes=True,
+                 upsert_batch_size=DEFAULT_UPSERT_BATCH_SIZE, count_strategy=DEFAULT_COUNT_STRATEGY,
+                 page_size=DEFAULT_PAGE_SIZE, state_store=None, polling_policy=None, lease_manager=None,
+                 circuit_breaker=None, detail_level=DEFAULT_DETAIL_LEVEL, max_samples=DEFAULT_MAX_SAMPLES,
+                 on_result=None, tenant=None, pregenerator=None):
+        if count_strategy not in COUNT_STRATEGIES:
+            raise ValueError(f"Unknown count strategy '{count_strategy}', expected one of {COUNT_STRATEGIES}")
+        if detail_level not in DETAIL_LEVELS:
+            raise ValueError(f"Unknown detail level '{detail_level}', expected one of {DETAIL_LEVELS}")
+
+        self.max_workers = max(1, int(max_workers or 1))
+        # ``client`` lets callers (benchmarks, fakes) supply their own Coda client; the default
+        # one shares the process-wide connection pool, sized for this engine's concurrency
+        self.coda = client or CodaClient(api_token, pool_size=self.max_workers)
+        self.count_strategy = count_strategy
+        self.page_size = max(1, int(page_size))
+        self.batch_writes = batch_writes
+        self.upsert_batch_size = max(1, int(upsert_batch_size))
+        # Optional SyncStateStore; when set, student docs unchanged since the last pass are not recounted
+        self.state_store = state_store
+        # Optional scheduler.PollingPolicy; with a state store, clients are only polled when due
+        self.polling_policy = polling_policy
+        # Optional leases.LeaseManager; when set, full passes only sync the rows this worker holds
+        self.lease_manager = lease_manager
+        # Optional circuit_breaker.DocCircuitBreaker; student docs that keep failing are left alone for a while
+        self.circuit_breaker = circuit_breaker
+        # What results keep per row (see DETAIL_LEVELS); ``on_result`` receives every row outcome as it is
+        # recorded, so callers can stream them elsewhere while the results stay small
+        self.detail_level = detail_level
+        self.max_samples = max(0, int(max_samples))
+        self.on_result = on_result
+        # Optional pregeneration.AudioPregenerator; with a tenant ``audio`` config, new and changed
+        # sentences of the tables read by a pass are queued for background synthesis
+        self.pregenerator = pregenerator
+
+        # The main doc and Clients table column mapping this engine syncs (see tenants.TenantConfig)
+        self.tenant = tenant or DEFAULT_TENANT
+        columns = self.tenant.columns
+        self.MAIN_DOC_ID = self.tenant.main_doc_id           # Main document ID containing the Clients table
+        self.CLIENTS_TABLE_ID = self.tenant.clients_table_id   # Clients table ID
 
         # Column IDs for the Clients table
-        self.COL_FIRST_NAME = "c-B5jqLzoe_x"
-        self.COL_LAST_NAME = "c-_WlEd-pWCg"
-        self.COL_CLIENT_DOC_ID = "c-jJ9R5VVvz0"  # The student's document ID
-        self.COL_SENTENCES_TABLE = "c-oN98cuRpc1"  # The student's sentences table ID
-        self.COL_NUM_SENTENCES = "c-JfGAyru56_"  # The column to update with the count
-        self.COL_DOC_URL = "c-5b3Ye-Mf5S"   # The URL to the student's document (not used here)
-
-    def sync_clients_sentence_counts(self):
-        """Sync sentence counts for all clients."""
+        self.COL_FIRST_NAME = columns.first_name
+        self.COL_LAST_NAME = columns.last_name
+        self.COL_CLIENT_DOC_ID = columns.client_doc_id  # The student's document ID
+        self.COL_SENTENCES_TABLE = columns.sentences_table  # The student's sentences table ID
+        self.COL_NUM_SENTENCES = columns.num_sentences  # The column to update with the count
+        self.COL_DOC_URL = columns.doc_url   # The URL to the student's document (not used here)
+
+    def sync_clients_sentence_counts(self, max_workers=None, on_result=None):
+        """
+        Sync sentence counts for all clients.
+
+        The Clients table is read page by page. Each page's rows are counted on a
+        bounded thread pool when ``max_workers`` (or the instance default) is
+        greater than 1, and one at a time otherwise. Counts that differ from the
+        value already in the row are then written back in bulk (see
+        ``_write_counts``) once the whole table has been read; unchanged rows
+        cost no writes. With a state store, rows whose student doc has not
+        been updated since it was last counted reuse the stored count instead
+        of fetching the doc again, and with a polling policy, clients whose doc
+        version is unknown (missing from the doc listing) are only checked
+        when due.
+        With a lease manager, rows leased to other workers are left to them, and
+        with a circuit breaker, student docs that keep failing are quarantined
+        and listed in ``quarantined_docs`` instead of being fetched every pass.
+        With an audio pregenerator and a tenant ``audio`` config, the new and
+        changed sentences of recounted clients are queued for synthesis and
+        counted in ``sentences_queued``. A failure on one row is recorded in ``details`` and never aborts the pass.
+        How many rows ``details`` keeps depends on ``detail_level``; every outcome
+        is also passed to ``on_result`` (or the instance default) as it is recorded.
+        The pass duration is reported in ``duration_seconds`` and, with the time
+        spent in each phase, in the ``metrics`` registry.
+        """
+        results = self._new_results()
+        workers = max_workers or self.max_workers
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for _ in self.iter_pass(results, executor, on_result or self.on_result):
+                pass
+        finally:
+            if executor:
+                executor.shutdown()
+
+        PASS_SECONDS.observe(results['duration_seconds'])
+        LAST_PASS_SECONDS.set(results['duration_seconds'])
+        return results
+
+    def iter_pass(self, results, executor=None, on_result=None, doc_versions=None):
+        """
+        Run a full pass into ``results``, yielding after each page of the Clients table.
+
+        Lets a caller interleave the passes of several engines (see
+        ``tenants.MultiTenantSync``). ``doc_versions`` can be supplied when the
+        caller has already listed the docs this pass. Changed counts are written
+        once the whole Clients table has been read (see ``_flush_writes``).
+        """
+        started = time.perf_counter()
+        # Doc id of every Clients row seen this pass, and the changed counts waiting for the scan to finish
+        doc_ids = Counter()
+        pending_writes = []
+        complete = False
+        try:
+            if doc_versions is None:
+                doc_versions = self._probe_doc_versions() if self.state_store else {}
+            if self.lease_manager:
+                self.lease_manager.heartbeat()
+
+            # Stream the Clients table one page at a time so it is never held in full
+            pages = self.coda.iter_row_pages(
+                doc_id=self.MAIN_DOC_ID,
+                table_id_or_name=self.CLIENTS_TABLE_ID,
+                page_size=self.page_size
+            )
+            while True:
+                with CLIENTS_FETCH_SECONDS.time():
+                    rows = next(pages, None)
+                if rows is None:
+                    break
+                self._sync_page(rows, executor, results, doc_versions, on_result=on_result,
+                                doc_ids=doc_ids, pending_writes=pending_writes)
+                yield
+            complete = True
+
+        except Exception as e:
+            results['error'] = str(e)
+            results['errors'] += 1
+
+        # After a failed scan, unread pages may repeat a doc id, so nothing is upserted
+        self._flush_writes(pending_writes, doc_ids if complete else None, results, on_result)
+
+        results['duration_seconds'] = round(time.perf_counter() - started, 3)
+
+    def sync_client(self, row_id=None, student_doc_id=None):
+        """
+        Recount and write back a single client, e.g. in response to a webhook.
+
+        The client is identified by its Clients row id or by its student doc id,
+        and is always recounted, even if it is not due, its doc looks unchanged or
+        it is quarantined (a success closes its circuit breaker).
+        Returns a results dict of the same shape as ``sync_clients_sentence_counts``.
+        """
+        if not (row_id or student_doc_id):
+            raise ValueError("Either row_id or student_doc_id is required")
+
+        results = self._new_results()
+        try:
+            if row_id:
+                rows = [self.coda.get_row(
+                    doc_id=self.MAIN_DOC_ID,
+                    table_id_or_name=self.CLIENTS_TABLE_ID,
+                    row_id_or_name=row_id
+                )]
+            else:
+                rows = list(self.coda.iter_rows(
+                    doc_id=self.MAIN_DOC_ID,
+                    table_id_or_name=self.CLIENTS_TABLE_ID,
+                    query=f"{self.COL_CLIENT_DOC_ID}:{json.dumps(student_doc_id)}"
+                ))
+                if not rows:
+                    raise ValueError(f"No client row found for doc {student_doc_id}")
+
+            self._sync_page(rows, None, results, force=True, on_result=self.on_result)
+
+        except Exception as e:
+            results['error'] = str(e)
+            results['errors'] += 1
+        return results
+
+    @staticmethod
+    def _new_results():
+        # details_dropped counts row outcomes left out of details by the detail level
+        return {
+            'total_rows_processed': 0,
+            'rows_updated': 0,
+            'rows_unchanged': 0,
+            'docs_skipped': 0,
+            'rows_not_due': 0,
+            'rows_not_owned': 0,
+            'rows_quarantined': 0,
+            'sentences_queued': 0,
+            'errors': 0,
+            'quarantined_docs': [],
+            'details': [],
+            'details_dropped': 0
+        }
+
+    def _probe_doc_versions(self):
+        """
+        Map every doc visible to the token to its ``updatedAt``.
+
+        Listing docs costs a handful of paged calls however many clients there are,
+        and tells us which student docs changed since their stored count.
+        Returns an empty dict (so nothing is skipped) if the listing fails.
+        """
         try:
-            # Retrieve the main Clients table data
-            clients_data = self.coda.list_rows(doc_id=self.MAIN_DOC_ID, table_id_or_name=self.CLIENTS_TABLE_ID)
-            
-            results = {
-                'total_rows_processed': 0,
-                'rows_updated': 0,
-                'errors': 0,
-                'details': []
+            return {doc.get("id"): doc.get("updatedAt") for doc in self.coda.iter_docs(page_size=self.page_size)}
+        except Exception as e:
+            logger.warning(f"Could not list docs, recounting every client this pass: {e}")
+            return {}
+
+    def _sync_page(self, rows, executor, results, doc_versions=None, force=False, on_result=None,
+                   doc_ids=None, pending_writes=None):
+        """
+        Count, write back and record one page of Clients rows.
+
+        During a full pass, the page's doc ids are added to ``doc_ids`` and its
+        changed counts are appended to ``pending_writes`` instead of being written
+        and recorded here; without them (single-client syncs) changed counts are
+        written right away, one row at a time.
+        """
+        row_key = self.tenant.row_key
+        if doc_ids is not None:
+            # Every row counts, including those leased to other workers: they share the upsert key column
+            doc_ids.update(row.get("values", {}).get(self.COL_CLIENT_DOC_ID) for row in rows)
+        if self.lease_manager and not force:
+            owned = self.lease_manager.claim([row_key(row.get("id")) for row in rows if row.get("id")])
+            results['rows_not_owned'] += len(rows) - len(owned)
+            ROWS.inc(len(rows) - len(owned), outcome='not_owned', tenant=self.tenant.name)
+            rows = [row for row in rows if row_key(row.get("id")) in owned]
+
+        states = self.state_store.get_many([row_key(row.get("id")) for row in rows]) if self.state_store else {}
+        count_row = partial(self._count_client_row, states=states, doc_versions=doc_versions, force=force)
+
+        # Count stage: fetch each student's sentence count
+        if executor:
+            # executor.map yields outcomes in row order, so details stay stable
+            outcomes = list(executor.map(count_row, rows))
+        else:
+            outcomes = [count_row(row) for row in rows]
+
+        if self.state_store:
+            self.state_store.record_many(
+                (row_key(o['row_id']), o['student_doc_id'], o['sentences_table_id'], o['sentence_count'],
+                 o['doc_updated_at'], o['last_changed_at'], o['next_due_at'])
+                for o in outcomes
+                if 'error' not in o and o['skipped'] not in ('not_due', 'quarantined')
+            )
+
+        # Pre-generation stage: queue audio for the sentences that changed in the docs just read
+        if self.pregenerator and self.tenant.audio:
+            scans = [o for o in outcomes if 'error' not in o and o['skipped'] in (None, 'unchanged_doc')]
+            queued = executor.map(self._queue_sentence_audio, scans) if executor else map(self._queue_sentence_audio, scans)
+            results['sentences_queued'] += sum(queued)
+
+        # Write stage: push only the counts that differ from the current cell
+        changed = [o for o in outcomes if o.get('changed')]
+        if pending_writes is not None:
+            pending_writes.extend(changed)
+            outcomes = [o for o in outcomes if not o.get('changed')]
+            write_errors = {}
+        else:
+            write_errors = self._write_counts(changed)
+
+        self._record_outcomes(results, outcomes, write_errors, on_result)
+
+    def _flush_writes(self, outcomes, doc_ids, results, on_result=None):
+        """Write and record the changed counts held back during a pass (see ``_write_counts``)."""
+        write_errors = self._write_counts(outcomes, doc_ids)
+        self._record_outcomes(results, outcomes, write_errors, on_result)
+
+    def _record_outcomes(self, results, outcomes, write_errors, on_result=None):
+        for outcome in outcomes:
+            if outcome['row_id'] in write_errors:
+                outcome = {
+                    'row_id': outcome['row_id'],
+                    'error': write_errors[outcome['row_id']]
+                }
+            self._record_outcome(results, outcome)
+            if on_result:
+                on_result(outcome)
+
+    def _count_client_row(self, row, states=None, doc_versions=None, force=False):
+        """
+        Count the sentences for a single Clients row, returning its detail entry.
+
+        Args:
+            row: The Clients table row
+            states: Stored sync state keyed by the tenant's row key (see ``SyncStateStore.get_many``)
+            doc_versions: Current ``updatedAt`` keyed by doc id (see ``_probe_doc_versions``)
+            force: Always count the table, ignoring due times and doc versions
+        """
+        row_id = row.get("id")
+        values = row.get("values", {})
+
+        # Get the student's document ID and their sentences table ID from the row values.
+        student_doc_id = values.get(self.COL_CLIENT_DOC_ID)
+        sentences_table_id = values.get(self.COL_SENTENCES_TABLE)
+
+        if not student_doc_id:
+            return {
+                'row_id': row_id,
+                'error': 'Missing client_doc_id'
             }
 
-            # Iterate through each row in the Clients table
-            for row in clients_data.get("items", []):
-                row_id = row.get("id")
-                values = row.get("values", {})
-                results['total_rows_processed'] += 1
-
-                # Get the student's document ID and their sentences table ID from the row values.
-                student_doc_id = values.get(self.COL_CLIENT_DOC_ID)
-                sentences_table_id = values.get(self.COL_SENTENCES_TABLE)
-
-                if not sentences_table_id:
-                    results['errors'] += 1
-                    results['details'].append({
-                        'row_id': row_id,
-                        'error': 'Missing sentences_table_id'
-                    })
-                    continue
+        breaker = self.circuit_breaker
+        quarantined_until = breaker.quarantined_until(student_doc_id) if breaker and not force else None
+        if quarantined_until:
+            return {
+                'row_id': row_id,
+                'student_doc_id': student_doc_id,
+                'skipped': 'quarantined',
+                'quarantined_until': quarantined_until
+            }
 
-                if not student_doc_id:
-                    results['errors'] += 1
-                    results['details'].append({
-                        'row_id': row_id,
-                        'error': 'Missing client_doc_id'
-                    })
-                    continue
+        if not sentences_table_id:
+            if breaker:
+                breaker.record_failure(student_doc_id, 'Missing sentences_table_id')
+            return {
+                'row_id': row_id,
+                'student_doc_id': student_doc_id,
+                'error': 'Missing sentences_table_id'
+            }
 
-                try:
-                    # Fetch the student's sentences table data from their document
-                    sentences_data = self.coda.list_rows(doc_id=student_doc_id, table_id_or_name=sentences_table_id)
-                    
-                    # Count the number of rows (each row represents a sentence)
-                    sentence_count = len(sentences_data.get("items", []))
-
-                    # Prepare the payload to update the 'num_sentences' column in the Clients table
-                    update_payload = {
-                        "row": {
+        doc_updated_at = (doc_versions or {}).get(student_doc_id)
+        state = (states or {}).get(self.tenant.row_key(row_id))
+        now = time.time()
+
+        try:
+            # skipped is None when the table was counted, otherwise why the stored count was reused
+            skipped = None
+            if not force and self._has_valid_state(state, student_doc_id, sentences_table_id):
+                # A known doc version decides on its own: a changed doc is recounted even if it is not due.
+                # The polling schedule only applies to docs the listing did not report
+                if doc_updated_at:
+                    if state['doc_updated_at'] == doc_updated_at:
+                        skipped = 'unchanged_doc'
+                elif self.polling_policy and not self.polling_policy.is_due(state, now):
+                    skipped = 'not_due'
+
+            if skipped:
+                sentence_count = state['last_count']
+            else:
+                # Count the number of rows (each row represents a sentence)
+                with CLIENT_COUNT_SECONDS.time():
+                    sentence_count = self._count_sentences(student_doc_id, sentences_table_id)
+                if breaker:
+                    breaker.record_success(student_doc_id)
+
+            # Hot clients (recent count changes) are polled often, dormant ones rarely
+            if state is None or state['last_count'] != sentence_count:
+                last_changed_at = now
+            else:
+                last_changed_at = state['last_changed_at'] or now
+            if skipped == 'not_due':
+                next_due_at = state['next_due_at']
+            elif self.polling_policy:
+                next_due_at = self.polling_policy.next_due(now, last_changed_at)
+            else:
+                next_due_at = None
+
+            # Compare against the value already stored in the Clients row
+            previous_count = self._coerce_count(values.get(self.COL_NUM_SENTENCES))
+
+            return {
+                'row_id': row_id,
+                'student_doc_id': student_doc_id,
+                'sentences_table_id': sentences_table_id,
+                'doc_updated_at': doc_updated_at,
+                'sentence_count': sentence_count,
+                'previous_count': previous_count,
+                'changed': sentence_count != previous_count,
+                'skipped': skipped,
+                'last_changed_at': last_changed_at,
+                'next_due_at': next_due_at
+            }
+
+        except Exception as e:
+            logger.error(f"Row {row_id}: failed to count sentences: {e}")
+            if breaker:
+                breaker.record_failure(student_doc_id, e)
+            return {
+                'row_id': row_id,
+                'student_doc_id': student_doc_id,
+                'error': str(e)
+            }
+
+    def _queue_sentence_audio(self, outcome):
+        """Queue audio pre-generation for one client's new and changed sentences; returns how many were queued."""
+        try:
+            return self.pregenerator.scan(
+                self.coda, self.tenant.audio, outcome['student_doc_id'], outcome['sentences_table_id'],
+                page_size=self.page_size, unchanged=outcome['skipped'] == 'unchanged_doc'
+            )
+        except Exception as e:
+            # Audio is a bonus; the count is already done and the table is scanned again next pass
+            logger.warning(f"Row {outcome['row_id']}: could not scan sentences for audio pre-generation: {e}")
+            return 0
+
+    @staticmethod
+    def _has_valid_state(state, student_doc_id, sentences_table_id):
+        """Whether the stored state holds a count for this row's current doc and table."""
+        return bool(
+            state
+            and state['last_count'] is not None
+            and state['student_doc_id'] == student_doc_id
+            and state['sentences_table_id'] == sentences_table_id
+        )
+
+    def next_due_times(self):
+        """When each client row is next due to be polled, keyed by row key (empty without a state store)."""
+        return self.state_store.next_due_times() if self.state_store else {}
+
+    def _count_sentences(self, doc_id, table_id):
+        """Count the rows of a student's sentences table using the configured strategy."""
+        if self.count_strategy == 'metadata':
+            try:
+                row_count = self.coda.get_table(doc_id=doc_id, table_id_or_name=table_id).get("rowCount")
+                if row_count is not None:
+                    return int(row_count)
+                logger.warning(f"Table {table_id} in doc {doc_id} has no rowCount, streaming instead")
+            except CodaAPIError as e:
+                if e.status_code in _NON_RECOVERABLE_STATUSES:
+                    raise
+                logger.warning(f"Metadata count failed for table {table_id} in doc {doc_id}, streaming instead: {e}")
+
+        return self._stream_count(doc_id, table_id)
+
+    def _stream_count(self, doc_id, table_id):
+        """Count rows page by page, keeping only the current page in memory."""
+        # The rows endpoint cannot omit cell values, so ask for the compact 'simple' format
+        pages = self.coda.iter_row_pages(
+            doc_id=doc_id,
+            table_id_or_name=table_id,
+            page_size=self.page_size,
+            value_format='simple'
+        )
+        return sum(len(items) for items in pages)
+
+    def _write_counts(self, outcomes, doc_ids=None):
+        """
+        Write computed sentence counts back to the Clients table.
+
+        Counts are flushed through Coda's bulk upsert endpoint in batches of
+        ``upsert_batch_size`` rows. The upsert endpoint matches on key columns rather
+        than row ids, so rows are keyed on the student doc id column, and a row is
+        only upserted when ``doc_ids``, the doc ids of the whole Clients table,
+        holds its doc id exactly once. Other rows, all rows when ``doc_ids`` is not
+        given, and any batch that fails are written one row at a time with
+        ``update_row`` instead. An upsert re-creates a row deleted since the scan
+        read it; see ``_remove_recreated_rows``.
+
+        Returns:
+            A dict mapping row_id to an error message for rows that could not be written
+        """
+        errors = {}
+        upserted, request_ids = [], []
+        if not self.batch_writes or doc_ids is None:
+            single = list(outcomes)
+        else:
+            batched = [o for o in outcomes if doc_ids[o['student_doc_id']] == 1]
+            single = [o for o in outcomes if doc_ids[o['student_doc_id']] != 1]
+
+            for start in range(0, len(batched), self.upsert_batch_size):
+                batch = batched[start:start + self.upsert_batch_size]
+                upsert_payload = {
+                    "rows": [
+                        {
                             "cells": [
-                                {"column": self.COL_NUM_SENTENCES, "value": sentence_count}
+                                {"column": self.COL_CLIENT_DOC_ID, "value": o['student_doc_id']},
+                                {"column": self.COL_NUM_SENTENCES, "value": o['sentence_count']}
                             ]
                         }
-                    }
-
-                    # Update the client's row in the main Clients table
-                    self.coda.update_row(
-                        doc_id=self.MAIN_DOC_ID,
-                        table_id_or_name=self.CLIENTS_TABLE_ID,
-                        row_id_or_name=row_id,
-                        data=update_payload
-                    )
-                    
-                    results['rows_updated'] += 1
-                    results['details'].append({
-                        'row_id': row_id,
-                        'student_doc_id': student_doc_id,
-                        'sentence_count': sentence_count
-                    })
-
+                        for o in batch
+                    ],
+                    "keyColumns": [self.COL_CLIENT_DOC_ID]
+                }
+                try:
+                    with WRITE_SECONDS.time():
+                        response = self.coda.upsert_row(
+                            doc_id=self.MAIN_DOC_ID,
+                            table_id_or_name=self.CLIENTS_TABLE_ID,
+                            data=upsert_payload
+                        )
                 except Exception as e:
-                    results['errors'] += 1
-                    results['details'].append({
-                        'row_id': row_id,
-                        'error': str(e)
-                    })
+                    logger.warning(f"Upsert of {len(batch)} rows failed, falling back to per-row writes: {e}")
+                    single.extend(batch)
+                    continue
+                upserted.extend(batch)
+                request_ids.append((response or {}).get("requestId"))
+
+        for outcome in single:
+            try:
+                self._update_count_row(outcome['row_id'], outcome['sentence_count'])
+            except Exception as e:
+                logger.error(f"Row {outcome['row_id']}: failed to update num_sentences: {e}")
+                errors[outcome['row_id']] = str(e)
 
-            return results
+        if upserted:
+            self._remove_recreated_rows(upserted, request_ids)
+        return errors
 
+    def _wait_for_mutations(self, request_ids):
+        """Wait until Coda has applied the given writes; returns False if they are still pending at the timeout."""
+        deadline = time.monotonic() + MUTATION_TIMEOUT_SECONDS
+        pending = [request_id for request_id in request_ids if request_id]
+        while pending:
+            pending = [request_id for request_id in pending
+                       if not self.coda.get_mutation_status(request_id).get("completed")]
+            if pending and time.monotonic() >= deadline:
+                return False
+            if pending:
+                time.sleep(MUTATION_POLL_SECONDS)
+        return True
+
+    def _remove_recreated_rows(self, outcomes, request_ids):
+        """
+        Delete the Clients rows the upserts inserted because a scanned row was deleted during the pass.
+
+        With key columns, Coda does not say which rows an upsert inserted, and
+        applies it asynchronously. So once the upserts have been applied, the
+        Clients table is read back: an upserted doc whose scanned row is gone and
+        that now has a row holding nothing but the written doc id and count had
+        its row re-created by the upsert, and that row is deleted.
+        """
+        try:
+            if not self._wait_for_mutations(request_ids):
+                logger.warning("Upserts not applied yet, not checking for re-created client rows")
+                return
+            expected = {outcome['student_doc_id']: outcome['row_id'] for outcome in outcomes}
+            seen, candidates = set(), []
+            written = {self.COL_CLIENT_DOC_ID, self.COL_NUM_SENTENCES}
+            for row in self.coda.iter_rows(doc_id=self.MAIN_DOC_ID, table_id_or_name=self.CLIENTS_TABLE_ID,
+                                           page_size=self.page_size):
+                values = row.get("values", {})
+                doc_id = values.get(self.COL_CLIENT_DOC_ID)
+                if doc_id not in expected:
+                    continue
+                seen.add(row.get("id"))
+                if all(value in (None, "", []) for column, value in values.items() if column not in written):
+                    candidates.append((doc_id, row.get("id")))
         except Exception as e:
-            return {
-                'error': str(e),
-                'total_rows_processed': results.get('total_rows_processed', 0),
-                'rows_updated': results.get('rows_updated', 0),
-                'errors': results.get('errors', 0) + 1,
-                'details': results.get('details', [])
+            logger.error(f"Could not check for re-created client rows: {e}")
+            return
+
+        for doc_id, row_id in candidates:
+            if row_id == expected[doc_id] or expected[doc_id] in seen:
+                continue
+            logger.warning(f"Upsert re-created the deleted client row of doc {doc_id} as {row_id}, removing it")
+            try:
+                with WRITE_SECONDS.time():
+                    self.coda.delete_row(doc_id=self.MAIN_DOC_ID, table_id_or_name=self.CLIENTS_TABLE_ID,
+                                         row_id_or_name=row_id)
+            except Exception as e:
+                logger.error(f"Could not remove re-created client row {row_id}: {e}")
+
+    def _update_count_row(self, row_id, sentence_count):
+        """Update the 'num_sentences' cell of a single Clients row."""
+        # Prepare the payload to update the 'num_sentences' column in the Clients table
+        update_payload = {
+            "row": {
+                "cells": [
+                    {"column": self.COL_NUM_SENTENCES, "value": sentence_count}
+                ]
             }
+        }
+
+        # Update the client's row in the main Clients table
+        with WRITE_SECONDS.time():
+            self.coda.update_row(
+                doc_id=self.MAIN_DOC_ID,
+                table_id_or_name=self.CLIENTS_TABLE_ID,
+                row_id_or_name=row_id,
+                data=update_payload
+            )
+
+    @staticmethod
+    def _coerce_count(value):
+        """Parse a num_sentences cell value (int, float or text) into an int, or None if empty."""
+        if value is None or value == "":
+            return None
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
 
+    def _keep_sample(self, samples, item):
+        """Append to a bounded sample list; returns False once the cap is reached."""
+        if self.detail_level == 'full' or len(samples) < self.max_samples:
+            samples.append(item)
+            return True
+        return False
 
+    def _record_outcome(self, results, outcome):
+        """Fold a single row outcome into the aggregate results."""
+        results['total_rows_processed'] += 1
+        if self.detail_level == 'full' or ('error' in outcome and self.detail_level == 'errors'):
+            kept = self._keep_sample(results['details'], outcome)
+        else:
+            kept = False
+        if not kept:
+            results['details_dropped'] += 1
 
+        if outcome.get('skipped') == 'quarantined':
+            results['rows_quarantined'] += 1
+            self._keep_sample(results['quarantined_docs'], {
+                'row_id': outcome['row_id'],
+                'student_doc_id': outcome['student_doc_id'],
+                'quarantined_until': outcome['quarantined_until']
+            })
+            ROWS.inc(outcome='quarantined', tenant=self.tenant.name)
+            return
+        if outcome.get('skipped') == 'unchanged_doc':
+            results['docs_skipped'] += 1
+            ROWS.inc(outcome='skipped', tenant=self.tenant.name)
+        elif outcome.get('skipped') == 'not_due':
+            results['rows_not_due'] += 1
+            ROWS.inc(outcome='not_due', tenant=self.tenant.name)
+        if 'error' in outcome:
+            results['errors'] += 1
+            ROWS.inc(outcome='error', tenant=self.tenant.name)
+        elif outcome.get('changed'):
+            results['rows_updated'] += 1
+            ROWS.inc(outcome='updated', tenant=self.tenant.name)
+        else:
+            results['rows_unchanged'] += 1
+            # Skipped rows were already counted under their own outcome; each row is counted once
+            if not outcome.get('skipped'):
+                ROWS.inc(outcome='unchanged', tenant=self.tenant.name)
@@ -0,0 +1,338 @@
+import os
+import time
+import random
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from rate_limiter import get_shared_rate_limiter
+from metrics import API_CALLS, API_RETRIES, API_THROTTLED
+
+logger = logging.getLogger(__name__)
+
+# Public Coda REST API; override with CODA_API_BASE_URL to point at a local stand-in
+CODA_API_BASE_URL = "https://coda.io/apis/v1"
+
+# Rows requested per page when iterating a table; Coda caps list limits at 200
+DEFAULT_PAGE_SIZE = 200
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_INITIAL_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+
+# Keep-alive connections kept per host; sized up to the sync concurrency on demand
+DEFAULT_POOL_SIZE = 8
+
+
+class CodaAPIError(Exception):
+    """Raised when the Coda API answers with a non-success status code."""
+
+    def __init__(self, status_code, message, headers=None):
+        super().__init__(f"Coda API error {status_code}: {message}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def is_retryable(error):
+    """Whether a failed Coda call may succeed if retried."""
+    if isinstance(error, CodaAPIError):
+        return error.status_code in RETRYABLE_STATUSES
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def parse_retry_after(headers):
+    """Seconds to wait according to a ``Retry-After`` header (delta-seconds or HTTP date), or None."""
+    value = (headers or {}).get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt, error=None, initial_delay=DEFAULT_INITIAL_DELAY, max_delay=DEFAULT_MAX_DELAY):
+    """
+    Delay before retry number ``attempt`` (0-based).
+
+    Honors the server's ``Retry-After`` when present, plus a little jitter so that
+    throttled callers do not all come back at the same instant; otherwise uses
+    exponential backoff with full jitter.
+    """
+    retry_after = parse_retry_after(getattr(error, 'headers', None))
+    if retry_after is not None:
+        return min(max_delay, retry_after + random.uniform(0, initial_delay))
+    return random.uniform(0, min(max_delay, initial_delay * (2 ** attempt)))
+
+
+class _SharedSession:
+    """
+    The process-wide ``requests.Session`` used for Coda traffic.
+
+    Its connection pool outlives individual clients and sync passes, so TLS
+    sessions and DNS lookups are paid once per connection rather than once per
+    run. The pool only ever grows: asking for more connections than it holds
+    remounts a larger adapter.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.session = None
+        self.pool_size = 0
+
+    def get(self, pool_size):
+        with self._lock:
+            if self.session is None:
+                self.session = requests.Session()
+            if pool_size > self.pool_size:
+                # pool_block makes extra threads wait for a pooled connection instead of
+                # opening a throwaway one that is discarded after the request
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+                self.session.mount('https://', adapter)
+                self.session.mount('http://', adapter)
+                self.pool_size = pool_size
+            return self.session
+
+    def _pool_counts(self):
+        """(connections opened, requests sent) summed over the current adapter's pools."""
+        opened = sent = 0
+        adapter = self.session.get_adapter(CODA_API_BASE_URL)
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            opened += getattr(pool, 'num_connections', 0)
+            sent += getattr(pool, 'num_requests', 0)
+        return opened, sent
+
+    def stats(self):
+        with self._lock:
+            if self.session is None:
+                return {'pool_size': 0, 'connections_opened': 0, 'requests_sent': 0, 'connection_reuse_ratio': 0.0}
+            opened, sent = self._pool_counts()
+            return {
+                'pool_size': self.pool_size,
+                'connections_opened': opened,
+                'requests_sent': sent,
+                # Fraction of requests that rode on an already-open connection
+                'connection_reuse_ratio': round(1 - opened / sent, 3) if sent else 0.0
+            }
+
+
+_shared_session = _SharedSession()
+
+
+def connection_stats():
+    """Connection pool size and reuse counters for the shared Coda session."""
+    return _shared_session.stats()
+
+
+class CodaClient:
+    """
+    Thin client for the Coda REST API.
+
+    Method names and arguments follow the ``codaio.Coda`` calls this project used,
+    but page tokens and table metadata are exposed directly so callers can stream
+    large tables instead of loading them whole.
+    """
+
+    def __init__(self, api_token, base_url=None, timeout=30, rate_limiter=None, max_retries=DEFAULT_MAX_RETRIES,
+                 pool_size=DEFAULT_POOL_SIZE):
+        self.base_url = (base_url or os.getenv('CODA_API_BASE_URL') or CODA_API_BASE_URL).rstrip('/')
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.max_retries = max_retries
+        self.retries = 0
+        # Clients are cheap wrappers around the shared, long-lived connection pool
+        self.session = _shared_session.get(max(1, int(pool_size)))
+        self._headers = {"Authorization": f"Bearer {api_token}"}
+
+    def _request(self, method, path, params=None, json=None):
+        """
+        Send a request to the API and return the decoded JSON body.
+
+        Every attempt draws from the shared rate limiter. Retryable failures (see
+        ``is_retryable``) are retried up to ``max_retries`` times; a 429 also pauses
+        the limiter for the server's ``Retry-After``. Other errors raise immediately.
+        """
+        kind = 'read' if method == 'GET' else 'write'
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(kind)
+            API_CALLS.inc(method=method)
+            try:
+                response = self.session.request(
+                    method,
+                    self.base_url + path,
+                    params=params,
+                    json=json,
+                    headers=self._headers,
+                    timeout=self.timeout
+                )
+                if response.status_code >= 400:
+                    raise CodaAPIError(response.status_code, response.text, response.headers)
+                return response.json() if response.content else {}
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                delay = retry_delay(attempt, e)
+                if getattr(e, 'status_code', None) == 429:
+                    API_THROTTLED.inc()
+                    self.rate_limiter.throttle(delay)
+                self.retries += 1
+                API_RETRIES.inc()
+                logger.warning(f"{method} {path} failed ({e}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    @staticmethod
+    def _table_path(doc_id, table_id_or_name):
+        return f"/docs/{quote(doc_id, safe='')}/tables/{quote(table_id_or_name, safe='')}"
+
+    def list_docs(self, limit=None, page_token=None):
+        """List one page of the docs visible to the API token."""
+        params = {}
+        if limit:
+            params['limit'] = limit
+        if page_token:
+            params['pageToken'] = page_token
+        return self._request('GET', "/docs", params=params)
+
+    def iter_docs(self, page_size=DEFAULT_PAGE_SIZE):
+        """Yield every doc visible to the API token, one page at a time."""
+        page_token = None
+        while True:
+            page = self.list_docs(limit=page_size, page_token=page_token)
+            yield from page.get('items', [])
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                return
+
+    def get_table(self, doc_id, table_id_or_name):
+        """Get a table's metadata, including its ``rowCount``."""
+        return self._request('GET', self._table_path(doc_id, table_id_or_name))
+
+    def get_row(self, doc_id, table_id_or_name, row_id_or_name):
+        """Get a single row."""
+        path = self._table_path(doc_id, table_id_or_name) + f"/rows/{quote(row_id_or_name, safe='')}"
+        return self._request('GET', path)
+
+    def list_rows(self, doc_id, table_id_or_name, limit=None, page_token=None, value_format=None, query=None,
+                  sync_token=None):
+        """
+        List rows in a table.
+
+        With ``limit`` or ``page_token`` a single page is returned together with its
+        ``nextPageToken``; without them every page is fetched and merged into
+        ``items``, like ``codaio.Coda.list_rows``. ``query`` filters rows with
+        Coda's ``<column_id>:<json value>`` syntax. ``sync_token``, the
+        ``nextSyncToken`` of an earlier listing, limits the rows to those added or
+        changed since then.
+        """
+        params = {}
+        if query:
+            params['query'] = query
+        if sync_token:
+            params['syncToken'] = sync_token
+        if limit:
+            params['limit'] = limit
+        if page_token:
+            params['pageToken'] = page_token
+        if value_format:
+            params['valueFormat'] = value_format
+
+        path = self._table_path(doc_id, table_id_or_name) + "/rows"
+        page = self._request('GET', path, params=params)
+        if limit or page_token:
+            return page
+
+        items = page.get('items', [])
+        while page.get('nextPageToken'):
+            params['pageToken'] = page['nextPageToken']
+            page = self._request('GET', path, params=params)
+            items.extend(page.get('items', []))
+        return {'items': items}
+
+    def iter_row_pages(self, doc_id, table_id_or_name, page_size=DEFAULT_PAGE_SIZE, value_format=None, query=None):
+        """
+        Yield a table's rows one page at a time, following ``nextPageToken``.
+
+        Only the page being yielded is held in memory, so arbitrarily large tables
+        can be scanned in constant space.
+        """
+        page_token = None
+        while True:
+            page = self.list_rows(
+                doc_id=doc_id,
+                table_id_or_name=table_id_or_name,
+                limit=page_size,
+                page_token=page_token,
+                value_format=value_format,
+                query=query
+            )
+            yield page.get('items', [])
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                return
+
+    def iter_row_changes(self, doc_id, table_id_or_name, sync_token=None, page_size=DEFAULT_PAGE_SIZE,
+                         value_format=None):
+        """
+        Yield ``(rows, next_sync_token)`` pages of the rows added or changed since ``sync_token``.
+
+        Without a token every row is listed. ``next_sync_token`` is None on every
+        page but the last; pass it to a later call to only get the rows changed
+        in between. Coda does not report deleted rows this way.
+        """
+        page_token = None
+        while True:
+            page = self.list_rows(
+                doc_id=doc_id,
+                table_id_or_name=table_id_or_name,
+                limit=page_size,
+                page_token=page_token,
+                value_format=value_format,
+                # Later pages are addressed by the page token alone, which carries the sync token along
+                sync_token=None if page_token else sync_token
+            )
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                yield page.get('items', []), page.get('nextSyncToken')
+                return
+            yield page.get('items', []), None
+
+    def iter_rows(self, doc_id, table_id_or_name, page_size=DEFAULT_PAGE_SIZE, value_format=None, query=None):
+        """Yield a table's rows one at a time (see ``iter_row_pages``)."""
+        for items in self.iter_row_pages(doc_id, table_id_or_name, page_size, value_format, query):
+            yield from items
+
+    def update_row(self, doc_id, table_id_or_name, row_id_or_name, data):
+        """Update a single row."""
+        path = self._table_path(doc_id, table_id_or_name) + f"/rows/{quote(row_id_or_name, safe='')}"
+        return self._request('PUT', path, json=data)
+
+    def delete_row(self, doc_id, table_id_or_name, row_id_or_name):
+        """Delete a single row."""
+        path = self._table_path(doc_id, table_id_or_name) + f"/rows/{quote(row_id_or_name, safe='')}"
+        return self._request('DELETE', path)
+
+    def upsert_row(self, doc_id, table_id_or_name, data):
+        """
+        Insert rows, updating existing ones that match ``data['keyColumns']``.
+
+        The write is applied asynchronously; the response's ``requestId`` can be
+        passed to ``get_mutation_status``. Coda only lists the inserted rows
+        (``addedRowIds``) when no key columns are given.
+        """
+        return self._request('POST', self._table_path(doc_id, table_id_or_name) + "/rows", json=data)
+
+    def get_mutation_status(self, request_id):
+        """Whether a queued write, by the ``requestId`` it returned, has been applied: ``{"completed": bool}``."""
+        return self._request('GET', f"/mutationStatus/{quote(request_id, safe='')}")
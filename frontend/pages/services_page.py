@@ -7,8 +7,7 @@ def show_services_page():
     """
     st.title("Services Status")
     
-    # Get all registered services from the registry
-    # The registry is a singleton that maintains a list of all available services
+    # Get all registered services from the registry, without building the ones not used yet
     services = ServiceRegistry.list_services()
     
     if not services:
@@ -16,25 +15,66 @@ def show_services_page():
         return
     
     # Display each service in an expandable section
-    for service_name, service in services.items():
+    for service_name, info in services.items():
         with st.expander(f"Service: {service_name}"):
-            # Show basic service information
-            st.write("Status: Active")
-            st.write(f"Type: {type(service).__name__}")
+            # Runtime details only exist once the service has been built by a first request
+            service = ServiceRegistry.loaded(service_name)
+            if service:
+                st.write("Status: Active")
+                st.write(f"Type: {type(service).__name__}")
+            else:
+                st.write("Status: Not loaded yet (built on first use)")
             
             # For Text-to-Speech service, show additional configuration details
             if service_name == 'text_to_speech':
                 # Check ElevenLabs API configuration
-                if hasattr(service, 'elevenlabs_api_key') and service.elevenlabs_api_key:
+                if info['config'].get('elevenlabs'):
                     st.success("✅ ElevenLabs API configured")
                 else:
                     st.error("❌ ElevenLabs API key not configured")
                 
-                # Check Google Cloud TTS configuration
-                if hasattr(service, 'google_client') and service.google_client:
+                # Check Google Cloud TTS configuration; a built service knows whether the client actually started
+                google_configured = service.google_client if service else info['config'].get('google')
+                if google_configured:
                     st.success("✅ Google Cloud TTS configured")
                 else:
                     st.error("❌ Google Cloud TTS not configured")
+
+                if hasattr(service, 'voice_catalog') and service.voice_catalog.loaded:
+                    catalog = service.voice_catalog.stats()
+                    st.write(f"ElevenLabs voice catalog: {catalog['voices']} voices, "
+                             f"refreshed {catalog['age_seconds']}s ago")
+
+                # Rolling provider health, used to route "auto" requests
+                provider_stats = service.provider_stats() if hasattr(service, 'provider_stats') else None
+                if provider_stats:
+                    st.markdown("#### Provider Latency")
+                    for provider, stats in provider_stats.items():
+                        if not stats['calls']:
+                            st.write(f"{provider}: no recent calls")
+                            continue
+                        st.write(
+                            f"{provider}: p50 {stats['p50_ms']} ms, p95 {stats['p95_ms']} ms, p99 {stats['p99_ms']} ms, "
+                            f"error rate {stats['error_rate']:.0%} over {stats['calls']} calls"
+                            + ("" if stats['healthy'] else " (unhealthy)")
+                        )
+
+                # Audio cache effectiveness
+                cache_stats = service.cache_stats() if hasattr(service, 'cache_stats') else None
+                if cache_stats:
+                    hit_ratio = cache_stats['hit_ratio']
+                    st.markdown("#### Audio Cache")
+                    st.write(
+                        f"Hit ratio: {'n/a' if hit_ratio is None else f'{hit_ratio:.0%}'} "
+                        f"({cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                        f"{cache_stats['bypassed']} bypassed)"
+                    )
+                    st.write(
+                        f"Size: {cache_stats['entries']} clips, "
+                        f"{cache_stats['bytes'] / 1024 / 1024:.1f} / {cache_stats['max_bytes'] / 1024 / 1024:.0f} MiB"
+                    )
+                elif service:
+                    st.info("Audio cache disabled")
                 
                 # Display supported languages
                 st.markdown("#### Supported Languages")
@@ -1,9 +1,21 @@
+import os
+import html
+import requests
 import streamlit as st
 import base64
 from io import BytesIO
 from models.service_models import TextToSpeechRequest, SUPPORTED_LANGUAGES
 from services.service_registry import ServiceRegistry
 
+# Flask app serving /tts/stream, used for streamed playback
+TTS_API_URL = os.getenv('TTS_API_URL', 'http://localhost:8000')
+# Sent to the Flask app, which requires it when it has one set
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+
+# Labels shown in the form -> values accepted by TextToSpeechRequest
+PROVIDERS = {"ElevenLabs": "elevenlabs", "Google": "google", "Auto": "auto"}
+GENDERS = {"Male": "male", "Female": "female"}
+
 def show_tts_page():
     st.title("Text to Speech")
     
@@ -23,16 +35,23 @@ def show_tts_page():
         with col1:
             provider = st.selectbox(
                 "Select Provider",
-                options=["ElevenLabs", "Google"],
-                index=0
+                options=list(PROVIDERS.keys()),
+                index=0,
+                help="Auto uses the fastest healthy provider and asks the other one if it is slow"
             )
         with col2:
             gender = st.selectbox(
                 "Select Voice Gender",
-                options=["MALE", "FEMALE"],
+                options=list(GENDERS.keys()),
                 index=0
             )
         
+        bypass_cache = st.checkbox("Bypass audio cache", value=False,
+                                   help="Always call the provider, even for text that was already synthesized")
+
+        stream_playback = st.checkbox("Stream playback", value=False,
+                                      help="Start playing while the audio is still being generated")
+
         # Submit button
         submitted = st.form_submit_button("Generate Speech")
         
@@ -42,27 +61,46 @@ def show_tts_page():
                 request = TextToSpeechRequest(
                     text=text,
                     language_code=SUPPORTED_LANGUAGES[language_name],
-                    provider=provider.upper(),
-                    gender=gender
+                    provider=PROVIDERS[provider],
+                    gender=GENDERS[gender],
+                    bypass_cache=bypass_cache
                 )
                 
-                # Get TTS service
-                tts_service = ServiceRegistry.get_instance().get_service('text_to_speech')
+                if stream_playback:
+                    # The browser fetches the chunked stream itself and starts playing on the first chunk.
+                    # It cannot send the secret or the text, so the app hands out a short-lived URL for them
+                    params = request.model_dump(mode='json', exclude={'timestamp'}, exclude_none=True)
+                    response = requests.post(
+                        f"{TTS_API_URL}/tts/stream/token",
+                        json=params,
+                        headers={'X-Webhook-Secret': WEBHOOK_SECRET} if WEBHOOK_SECRET else {},
+                        timeout=10
+                    )
+                    if not response.ok:
+                        raise RuntimeError(response.json().get('error', response.reason))
+                    stream_url = f"{TTS_API_URL}{response.json()['url']}"
+                    st.markdown(f'<audio controls autoplay src="{html.escape(stream_url)}" type="audio/mpeg"></audio>',
+                                unsafe_allow_html=True)
+                else:
+                    # Get TTS service
+                    tts_service = ServiceRegistry.get('text_to_speech')
                 
-                # Generate speech
-                response = tts_service.process(request)
+                    # Generate speech
+                    response = tts_service.process(request)
                 
-                # Create audio player
-                audio_b64 = base64.b64encode(response.audio_content).decode()
-                audio_tag = f'<audio controls><source src="data:audio/mp3;base64,{audio_b64}" type="audio/mp3"></audio>'
-                st.markdown(audio_tag, unsafe_allow_html=True)
+                    # Create audio player
+                    audio_b64 = base64.b64encode(response.audio_content).decode()
+                    audio_tag = f'<audio controls><source src="data:audio/mp3;base64,{audio_b64}" type="audio/mp3"></audio>'
+                    st.markdown(audio_tag, unsafe_allow_html=True)
                 
-                # Display additional info
-                st.info(f"""
-                    Duration: {response.duration_ms/1000:.2f} seconds
-                    Voice ID: {response.voice_id}
-                    Format: {response.audio_format}
-                """)
+                    # Display additional info
+                    st.info(f"""
+                        Duration: {f'{response.duration_ms / 1000:.2f} seconds' if response.duration_ms else 'n/a'}
+                        Provider: {response.provider}
+                        Voice ID: {response.voice_id}
+                        Format: {response.audio_format}
+                        Served from cache: {'yes' if response.cached else 'no'}
+                    """)
                 
             except Exception as e:
                 st.error(f"Error generating speech: {str(e)}")
@@ -77,6 +115,7 @@ def show_tts_page():
         - **ElevenLabs**: High-quality, expressive voices
         - **Google Cloud TTS**: Professional, clear voices
         
+        **Auto** picks whichever of the two is currently fastest and healthy.
         Choose the provider and voice options that best suit your needs.
         """)
 
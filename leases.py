@@ -0,0 +1,140 @@
+import os
+import time
+import socket
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# How long a lease or worker heartbeat stays valid without renewal
+DEFAULT_LEASE_SECONDS = 300
+
+
+def default_worker_id():
+    """A worker id that is unique per process: the Heroku dyno name or host, plus the pid."""
+    return f"{os.getenv('DYNO') or socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseManager:
+    """
+    Splits the Clients table between sync workers using renewable leases.
+
+    Workers share a SQLite database. Each pass, a worker renews its heartbeat and
+    then claims the rows that rendezvous hashing assigns to it among the live
+    workers. A row can only be claimed if it is unleased, already ours, or its
+    lease has expired, so two workers never sync the same row at once. When a
+    worker stops heartbeating, it drops out of the live set, its rows hash to
+    the survivors, and they take them over as soon as its leases expire. When a
+    worker joins, the others release the rows that now hash to it.
+    """
+
+    def __init__(self, path, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS):
+        self.path = path
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        # isolation_level=None lets us issue BEGIN IMMEDIATE to serialize claims across processes
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS workers (
+                    worker_id TEXT PRIMARY KEY,
+                    heartbeat_at REAL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    row_id TEXT PRIMARY KEY,
+                    owner TEXT,
+                    expires_at REAL
+                )
+            """)
+
+    def heartbeat(self):
+        """Mark this worker as alive."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO workers (worker_id, heartbeat_at) VALUES (?, ?) "
+                "ON CONFLICT(worker_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+                (self.worker_id, time.time())
+            )
+
+    def live_workers(self):
+        """Ids of the workers whose heartbeat has not expired, including this one."""
+        cutoff = time.time() - self.lease_seconds
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT worker_id FROM workers WHERE heartbeat_at >= ? ORDER BY worker_id", (cutoff,)
+            ).fetchall()
+        workers = {row[0] for row in rows}
+        workers.add(self.worker_id)
+        return sorted(workers)
+
+    @staticmethod
+    def _owner_for(row_id, workers):
+        """Rendezvous hashing: every worker computes the same owner, and few rows move when workers change."""
+        return max(workers, key=lambda worker: hashlib.sha1(f"{worker}:{row_id}".encode()).digest())
+
+    def claim(self, row_ids):
+        """
+        Claim or renew leases on this worker's share of ``row_ids``.
+
+        Returns:
+            The set of row ids this worker now holds and should sync
+        """
+        row_ids = [row_id for row_id in row_ids if row_id]
+        if not row_ids:
+            return set()
+
+        workers = self.live_workers()
+        mine, not_mine = [], []
+        for row_id in row_ids:
+            (mine if self._owner_for(row_id, workers) == self.worker_id else not_mine).append(row_id)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO leases (row_id, owner, expires_at) VALUES (?, ?, ?)
+                    ON CONFLICT(row_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                    WHERE leases.owner = excluded.owner OR leases.expires_at < ?
+                    """,
+                    [(row_id, self.worker_id, now + self.lease_seconds, now) for row_id in mine]
+                )
+                # Hand back rows that now hash to another worker so it can pick them up
+                self._conn.executemany(
+                    "DELETE FROM leases WHERE row_id = ? AND owner = ?",
+                    [(row_id, self.worker_id) for row_id in not_mine]
+                )
+                placeholders = ",".join("?" for _ in mine)
+                owned = {
+                    row[0] for row in self._conn.execute(
+                        f"SELECT row_id FROM leases WHERE owner = ? AND row_id IN ({placeholders})",
+                        [self.worker_id, *mine]
+                    )
+                } if mine else set()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return owned
+
+    def release_all(self):
+        """Give up every lease and leave the live set, e.g. on shutdown."""
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE owner = ?", (self.worker_id,))
+            self._conn.execute("DELETE FROM workers WHERE worker_id = ?", (self.worker_id,))
+        logger.info(f"Worker {self.worker_id} released its leases")
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            held = self._conn.execute(
+                "SELECT COUNT(*) FROM leases WHERE owner = ? AND expires_at >= ?", (self.worker_id, now)
+            ).fetchone()[0]
+        return {'worker_id': self.worker_id, 'live_workers': len(self.live_workers()), 'leases_held': held}
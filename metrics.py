@@ -0,0 +1,204 @@
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from a single API call up to a slow full pass
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=None):
+    pairs = list(key) + list(extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    """A monotonically increasing count, optionally split by labels."""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            if set(self._values) <= {()}:
+                return self._values.get((), 0)
+            return {",".join(f"{k}={v}" for k, v in key): value for key, value in sorted(self._values.items())}
+
+
+class Gauge(Counter):
+    """A value that can go up and down, e.g. the duration of the last pass."""
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """Cumulative bucketed observations, rendered in the Prometheus histogram format."""
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        """Observe the wall-clock duration of the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            cumulative = 0
+            for bound, count in zip(self.buckets, self._counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{le="+Inf"}} {self._count}')
+            lines.append(f"{self.name}_sum {self._sum}")
+            lines.append(f"{self.name}_count {self._count}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'count': self._count,
+                'avg_ms': round(self._sum / self._count * 1000, 2) if self._count else None
+            }
+
+
+class Registry:
+    """Holds every metric of the process and renders them together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, help_text, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name, help_text):
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name, help_text):
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+    def snapshot(self):
+        """A compact dict of every metric, suitable for a structured log line."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+
+REGISTRY = Registry()
+
+# Coda API traffic
+API_CALLS = REGISTRY.counter('coda_api_calls_total', "Coda API requests sent, by HTTP method")
+API_RETRIES = REGISTRY.counter('coda_api_retries_total', "Coda API requests retried after a retryable failure")
+API_THROTTLED = REGISTRY.counter('coda_api_throttled_total', "Coda API responses with status 429")
+
+# Sync pipeline phases
+PASS_SECONDS = REGISTRY.histogram('coda_sync_pass_seconds', "Duration of full sync passes")
+LAST_PASS_SECONDS = REGISTRY.gauge('coda_sync_last_pass_seconds', "Duration of the most recent full sync pass")
+CLIENTS_FETCH_SECONDS = REGISTRY.histogram('coda_sync_clients_fetch_seconds', "Time to fetch one page of the Clients table")
+CLIENT_COUNT_SECONDS = REGISTRY.histogram('coda_sync_client_count_seconds', "Time to count one client's sentences table")
+WRITE_SECONDS = REGISTRY.histogram('coda_sync_write_seconds', "Time of each num_sentences write (bulk upsert or single row)")
+ROWS = REGISTRY.counter('coda_sync_rows_total', "Clients rows processed, by outcome")
+QUARANTINED_DOCS = REGISTRY.gauge('coda_sync_quarantined_docs', "Student docs currently quarantined by the circuit breaker")
+
+# Text-to-speech providers
+TTS_PROVIDER_REQUESTS = REGISTRY.counter('tts_provider_requests_total', "Text-to-speech provider calls, by provider and outcome")
+TTS_PROVIDER_LATENCY = REGISTRY.gauge('tts_provider_latency_seconds',
+                                      "Rolling text-to-speech provider latency percentiles, by provider and quantile")
+TTS_HEDGED = REGISTRY.counter('tts_hedged_requests_total', "Auto-routed requests that fired a hedge, by which provider won")
+TTS_PREGENERATED = REGISTRY.counter('tts_pregenerated_sentences_total',
+                                    "Sentences processed by audio pre-generation, by outcome (synthesized, cached, error, abandoned, dropped)")
+
+
+def render_prometheus():
+    return REGISTRY.render_prometheus()
+
+
+def start_http_server(port, host='0.0.0.0'):
+    """Serve ``/metrics`` on a background thread, for processes without a web app (e.g. the worker)."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving metrics on port {server.server_port}")
+    return server
@@ -20,9 +20,13 @@ class TextToSpeechRequest(BaseRequest):
     text: str = Field(..., description="The text to convert to speech")
     language_code: str = Field(..., description="Language code (e.g., 'en-US', 'fr-FR')")
     gender: Literal['male', 'female'] = Field(default='female', description="Voice gender")
-    provider: Literal['elevenlabs', 'google'] = Field(default='elevenlabs', description="TTS provider to use")
+    provider: Literal['elevenlabs', 'google', 'auto'] = Field(
+        default='elevenlabs',
+        description="TTS provider to use; 'auto' routes to the fastest healthy provider and hedges slow calls"
+    )
     voice_id: Optional[str] = Field(None, description="Specific voice ID (for ElevenLabs)")
     model: Optional[str] = Field(default="eleven_multilingual_v2", description="Model to use for generation")
+    bypass_cache: bool = Field(default=False, description="Always call the provider, refreshing any cached audio")
 
 class TextToSpeechResponse(BaseResponse):
     """Response model for text-to-speech conversion."""
@@ -32,4 +36,5 @@ class TextToSpeechResponse(BaseResponse):
     duration_ms: Optional[int] = Field(None, description="Duration of the audio in milliseconds")
     provider: str = Field(..., description="Provider used for generation")
     language_code: str = Field(..., description="Language code used")
-    gender: str = Field(..., description="Gender of the voice used") 
\ No newline at end of file
+    gender: str = Field(..., description="Gender of the voice used")
+    cached: bool = Field(default=False, description="Whether the audio was served from the audio cache") 
\ No newline at end of file
@@ -0,0 +1,250 @@
+import queue
+import logging
+import threading
+from coda_client import CodaAPIError
+from metrics import TTS_PREGENERATED
+from models.service_models import TextToSpeechRequest, SUPPORTED_LANGUAGES
+from services.service_registry import ServiceRegistry
+
+logger = logging.getLogger(__name__)
+
+# Background synthesis threads; the text-to-speech provider limits still apply on top
+DEFAULT_PREGEN_WORKERS = 2
+# Sentences waiting for synthesis before scans stop queueing (and retry their tables next pass)
+DEFAULT_MAX_QUEUED = 10000
+# Failed syntheses of a sentence before it is given up on, letting its table's sync token move past it
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Coda's answers to a sync token it no longer accepts; the table is then listed in full
+_EXPIRED_TOKEN_STATUSES = (400, 410)
+
+
+class AudioPregenerator:
+    """
+    Synthesizes the audio of new and changed sentences in the background.
+
+    During a sync pass, ``scan`` lists the rows of a student's sentences table
+    that were added or changed since the previous scan, using the table's Coda
+    sync token kept in the state store, and queues their text for synthesis.
+    Worker threads push the queue through ``TextToSpeechService.process``, which
+    stores the audio in the service's audio cache, so a student's later request
+    for the sentence is a cache hit. Only sentences whose text, language or
+    voice has never been synthesized cost a provider call, even when a table has
+    to be listed in full again.
+
+    A table's sync token only advances once every sentence its scan queued has
+    been synthesized. Until then, and after a failure or a restart, the next
+    scan lists the same rows again; those already synthesized are cache hits.
+    A sentence that fails ``max_attempts`` times in a row (e.g. no voice exists
+    for its language) is given up on, so it cannot hold its table back forever;
+    it is tried again once its row changes.
+    """
+
+    def __init__(self, state_store=None, tts_service=None, workers=DEFAULT_PREGEN_WORKERS,
+                 max_queued=DEFAULT_MAX_QUEUED, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.state_store = state_store
+        self._tts_service = tts_service
+        self.workers = max(1, int(workers))
+        self.max_attempts = max(1, int(max_attempts))
+        self._failures = {}  # cache-relevant fields of a failing request -> consecutive failures
+        self._queue = queue.Queue(maxsize=max(1, int(max_queued)))
+        self._queued = {}  # cache-relevant fields of a waiting request -> tables waiting for it
+        self._tables = {}  # table key -> {'waiting': sentences left, 'token': token to save, 'failed': bool}
+        self._lock = threading.Lock()
+        self._threads = []
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.abandoned = 0
+
+    @property
+    def tts_service(self):
+        # The service and its provider SDKs are only loaded once there is something to synthesize
+        if self._tts_service is None:
+            self._tts_service = ServiceRegistry.get('text_to_speech')
+        return self._tts_service
+
+    def scan(self, coda, audio, doc_id, table_id, page_size=None, unchanged=False):
+        """
+        Queue the sentences of a table that changed since its last scan.
+
+        Args:
+            coda: Coda client to list the rows with
+            audio: The tenant's ``TenantAudio`` settings
+            doc_id: Student doc ID
+            table_id: Sentences table ID
+            page_size: Rows per page
+            unchanged: The doc is known not to have changed; the table is then only
+                listed if it has never been scanned
+
+        Returns:
+            The number of sentences queued
+        """
+        table_key = f"{doc_id}/{table_id}"
+        sync_token = self.state_store.get_sync_token(table_key) if self.state_store else None
+        if unchanged and sync_token:
+            return 0
+        try:
+            return self._scan(coda, audio, doc_id, table_id, table_key, sync_token, page_size)
+        except CodaAPIError as e:
+            if not sync_token or e.status_code not in _EXPIRED_TOKEN_STATUSES:
+                raise
+            logger.info(f"Sync token of {table_key} rejected ({e.status_code}), listing the table in full")
+            return self._scan(coda, audio, doc_id, table_id, table_key, None, page_size)
+
+    def _scan(self, coda, audio, doc_id, table_id, table_key, sync_token, page_size):
+        kwargs = {'page_size': page_size} if page_size else {}
+        queued, complete, next_token = 0, True, None
+        # The scan itself holds the table open, so sentences finishing meanwhile cannot save a token early
+        with self._lock:
+            self._wait(table_key)
+        try:
+            for rows, next_token in coda.iter_row_changes(doc_id, table_id, sync_token=sync_token,
+                                                          value_format='simple', **kwargs):
+                for row in rows:
+                    request = self._request_for(row.get("values", {}), audio)
+                    if request is None:
+                        continue
+                    result = self._enqueue(request, table_key)
+                    if result is None:
+                        complete = False
+                    queued += bool(result)
+        except Exception:
+            self._release([table_key], ok=True)
+            raise
+
+        # A table whose sentences did not all fit in the queue is scanned from the same token next time;
+        # otherwise the token is saved once its last queued sentence is synthesized
+        with self._lock:
+            if complete and next_token:
+                self._tables[table_key]['token'] = next_token
+        for done_key, token in self._release([table_key], ok=True):
+            self._save_token(done_key, token)
+        if queued:
+            logger.info(f"Queued {queued} sentences of {table_key} for audio pre-generation")
+        return queued
+
+    @staticmethod
+    def _request_for(values, audio):
+        text = values.get(audio.sentence_column)
+        if not isinstance(text, str) or not text.strip():
+            return None
+        language = values.get(audio.language_column) if audio.language_column else None
+        # The column may hold a code ('fr-FR') or one of the supported language names ('French')
+        language = SUPPORTED_LANGUAGES.get(language, language) if isinstance(language, str) and language else None
+        return TextToSpeechRequest(
+            text=text.strip(),
+            language_code=language or audio.language_code,
+            gender=audio.gender,
+            provider=audio.provider
+        )
+
+    def _save_token(self, table_key, token):
+        if self.state_store:
+            self.state_store.save_sync_token(table_key, token)
+
+    def _enqueue(self, request, table_key):
+        """
+        Queue a request for a table. Returns True if queued, False if already waiting (the table
+        then waits for it too), None if the queue is full.
+        """
+        key = (request.text, request.language_code, request.gender, request.provider)
+        with self._lock:
+            waiting = self._queued.get(key)
+            if waiting is not None:
+                if table_key not in waiting:
+                    waiting.add(table_key)
+                    self._wait(table_key)
+                return False
+            try:
+                self._queue.put_nowait((key, request))
+            except queue.Full:
+                self.dropped += 1
+                TTS_PREGENERATED.inc(outcome='dropped')
+                return None
+            self._queued[key] = {table_key}
+            self._wait(table_key)
+        self._start()
+        return True
+
+    def _wait(self, table_key):
+        table = self._tables.setdefault(table_key, {'waiting': 0, 'token': None, 'failed': False})
+        table['waiting'] += 1
+
+    def _finish(self, key, ok):
+        """Settle a processed sentence; returns the (table key, token) pairs now safe to save."""
+        with self._lock:
+            table_keys = self._queued.pop(key, ())
+        return self._release(table_keys, ok)
+
+    def _release(self, table_keys, ok):
+        done = []
+        with self._lock:
+            for table_key in table_keys:
+                table = self._tables[table_key]
+                table['failed'] = table['failed'] or not ok
+                table['waiting'] -= 1
+                if table['waiting']:
+                    continue
+                del self._tables[table_key]
+                if table['failed']:
+                    logger.info(f"Audio pre-generation of {table_key} had failures, it is scanned again next pass")
+                elif table['token']:
+                    done.append((table_key, table['token']))
+        return done
+
+    def _start(self):
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run, name=f"audio-pregen-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            key, request = self._queue.get()
+            ok = False
+            try:
+                # A sentence already in the audio cache is a cheap hit here
+                result = self.tts_service.process(request)
+                ok = True
+                with self._lock:
+                    self.processed += 1
+                    self._failures.pop(key, None)
+                TTS_PREGENERATED.inc(outcome='cached' if result.cached else 'synthesized')
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                    attempts = self._failures[key] = self._failures.get(key, 0) + 1
+                    if attempts >= self.max_attempts:
+                        # Settled like a success so the table's token moves on
+                        del self._failures[key]
+                        self.abandoned += 1
+                        ok = True
+                TTS_PREGENERATED.inc(outcome='abandoned' if ok else 'error')
+                logger.warning(f"Audio pre-generation failed for {request.text[:40]!r} (attempt {attempts}"
+                               f"{', giving up' if ok else ''}): {e}")
+            finally:
+                try:
+                    for table_key, token in self._finish(key, ok):
+                        self._save_token(table_key, token)
+                except Exception as e:
+                    logger.error(f"Could not save the sync token after audio pre-generation: {e}")
+                finally:
+                    self._queue.task_done()
+
+    def join(self):
+        """Block until every queued sentence has been processed."""
+        self._queue.join()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._queued),
+                'tables_pending': len(self._tables),
+                'processed': self.processed,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'abandoned': self.abandoned
+            }
@@ -0,0 +1,127 @@
+import os
+import math
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Coda allows 100 reads and 10 writes per 6 seconds per API token
+DEFAULT_READ_RATE = 100 / 6
+DEFAULT_WRITE_RATE = 10 / 6
+
+
+class TokenBucket:
+    """A thread-safe token bucket refilled continuously at ``rate`` tokens per second."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1, math.ceil(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1):
+        """Take ``tokens`` if available; otherwise return the seconds to wait before retrying."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until ``tokens`` are available and take them. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    @property
+    def available(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class RateLimiter:
+    """
+    Process-wide budget for Coda API calls.
+
+    Reads and writes draw from separate token buckets, matching Coda's separate
+    limits. When Coda answers 429, ``throttle`` pauses every caller until the
+    server's ``Retry-After`` has passed, so threads back off together instead of
+    each hammering the API with its own retries.
+    """
+
+    def __init__(self, read_rate=DEFAULT_READ_RATE, write_rate=DEFAULT_WRITE_RATE):
+        self.buckets = {
+            'read': TokenBucket(read_rate),
+            'write': TokenBucket(write_rate)
+        }
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.acquired = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.throttled = 0
+
+    def acquire(self, kind='read'):
+        """Block until a call of the given kind ('read' or 'write') fits in the budget."""
+        waited = 0.0
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+            waited += pause
+        waited += self.buckets[kind].acquire()
+
+        with self._lock:
+            self.acquired += 1
+            if waited:
+                self.waits += 1
+                self.wait_seconds += waited
+
+    def throttle(self, retry_after):
+        """Record a 429 and hold back every caller for ``retry_after`` seconds."""
+        with self._lock:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        logger.warning(f"Coda rate limit hit, pausing all calls for {retry_after:.1f}s")
+
+    def stats(self):
+        """Current budget and throttle counters, for tuning concurrency."""
+        with self._lock:
+            return {
+                'read_tokens_available': round(self.buckets['read'].available, 2),
+                'write_tokens_available': round(self.buckets['write'].available, 2),
+                'read_rate_per_sec': round(self.buckets['read'].rate, 2),
+                'write_rate_per_sec': round(self.buckets['write'].rate, 2),
+                'paused_for_seconds': round(max(0.0, self._paused_until - time.monotonic()), 2),
+                'calls_acquired': self.acquired,
+                'waits': self.waits,
+                'wait_seconds': round(self.wait_seconds, 2),
+                'throttled': self.throttled
+            }
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter():
+    """Return the rate limiter shared by every Coda client in this process."""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter(
+                read_rate=float(os.getenv('CODA_READ_RATE_LIMIT', DEFAULT_READ_RATE)),
+                write_rate=float(os.getenv('CODA_WRITE_RATE_LIMIT', DEFAULT_WRITE_RATE))
+            )
+        return _shared_limiter
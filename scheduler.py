@@ -0,0 +1,96 @@
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the adaptive per-client polling interval, in seconds
+DEFAULT_MIN_POLL_INTERVAL = 60
+DEFAULT_MAX_POLL_INTERVAL = 6 * 60 * 60
+# A client is polled again after this fraction of the time it has been idle
+DEFAULT_IDLE_FACTOR = 0.1
+# Clients due within this many seconds of a pass are handled by that pass
+DUE_SLACK_SECONDS = 5
+
+
+class PollingPolicy:
+    """
+    Decides how often each client's sentences table is polled.
+
+    The interval grows with the time since the client's count last changed: a
+    table that changed a minute ago is polled every ``min_interval`` seconds, one
+    that has been dormant for months only every ``max_interval`` seconds.
+    """
+
+    def __init__(self, min_interval=DEFAULT_MIN_POLL_INTERVAL, max_interval=DEFAULT_MAX_POLL_INTERVAL,
+                 idle_factor=DEFAULT_IDLE_FACTOR):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.idle_factor = idle_factor
+
+    def interval(self, idle_seconds):
+        return min(self.max_interval, max(self.min_interval, idle_seconds * self.idle_factor))
+
+    def next_due(self, now, last_changed_at):
+        """When a client checked at ``now`` should next be polled."""
+        idle = now - last_changed_at if last_changed_at else 0
+        return now + self.interval(idle)
+
+    @staticmethod
+    def is_due(state, now):
+        """Whether a client with the given stored state should be polled in a pass starting at ``now``."""
+        next_due_at = (state or {}).get('next_due_at')
+        return next_due_at is None or next_due_at <= now + DUE_SLACK_SECONDS
+
+
+class SyncScheduler:
+    """
+    Runs sync passes back to back, never two at once.
+
+    A pass starts ``interval`` seconds after the previous one started, or right
+    after it finishes if it overran. Pass durations are kept so slow passes are
+    visible in ``stats()``.
+    """
+
+    def __init__(self, run_pass, interval=60, history=100):
+        self.run_pass = run_pass
+        self.interval = interval
+        self.durations = deque(maxlen=history)
+        self.passes = 0
+        self.overruns = 0
+
+    def run_once(self):
+        """Run a single pass and record how long it took."""
+        started = time.monotonic()
+        try:
+            self.run_pass()
+        finally:
+            duration = time.monotonic() - started
+            self.durations.append(duration)
+            self.passes += 1
+            if duration > self.interval:
+                self.overruns += 1
+                logger.warning(f"Sync pass took {duration:.1f}s, longer than the {self.interval}s interval")
+        return duration
+
+    def run_forever(self):
+        while True:
+            try:
+                duration = self.run_once()
+                time.sleep(max(0.0, self.interval - duration))
+            except KeyboardInterrupt:
+                logger.info("Sync scheduler stopped by user")
+                break
+            except Exception as e:
+                logger.error(f"Error in scheduler: {str(e)}")
+                time.sleep(self.interval)
+
+    def stats(self):
+        durations = sorted(self.durations)
+        return {
+            'passes': self.passes,
+            'overruns': self.overruns,
+            'last_pass_seconds': round(self.durations[-1], 2) if self.durations else None,
+            'median_pass_seconds': round(durations[len(durations) // 2], 2) if durations else None,
+            'max_pass_seconds': round(durations[-1], 2) if durations else None
+        }
@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Where synthesized audio is kept, relative to the working directory
+DEFAULT_CACHE_DIR = ".tts_cache"
+# Total size of cached audio before the least recently used entries are evicted
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+# How often a writing process re-reads the directory to account for entries other processes wrote
+DEFAULT_RESCAN_SECONDS = 60
+
+
+class AudioCache:
+    """
+    Content-addressed on-disk cache of synthesized audio.
+
+    Entries are keyed on a SHA-256 of everything that determines the audio
+    (text, language, gender, provider, voice and model) and stored as one MP3
+    file plus a small JSON metadata file. When the total size exceeds
+    ``max_bytes``, the least recently used entries are evicted. Recency survives
+    restarts through the files' modification times.
+
+    Several processes (the web app and the sync worker) can share a directory:
+    a lookup that misses the in-memory index checks the disk before counting a
+    miss, and a writer re-reads the directory at most every ``rescan_seconds``
+    so entries written elsewhere count towards ``max_bytes`` and are evicted in
+    the shared least-recently-used order.
+
+    Processes without a common filesystem (separate Heroku dynos) share entries
+    through a ``store`` such as ``S3AudioStore``: every entry written is also
+    sent there, and a local miss is looked up there before counting as a miss.
+    The directory then works as a local copy of the store.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 rescan_seconds: float = DEFAULT_RESCAN_SECONDS, store=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rescan_seconds = rescan_seconds
+        self.store = store
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.store_hits = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scanned_at = 0.0
+        self._load()
+
+    @staticmethod
+    def make_key(text: str, language_code: str, gender: str, provider: str,
+                 voice_id: Optional[str], model: Optional[str]) -> str:
+        """Hash the synthesis parameters into a cache key."""
+        payload = json.dumps([text, language_code, gender, provider, voice_id, model], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        # Two-character fan-out keeps directories small with many entries
+        base = os.path.join(self.directory, key[:2], key)
+        return base + ".mp3", base + ".json"
+
+    def _scan(self):
+        """The entries on disk as (modified at, key, size), oldest first."""
+        found = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".mp3"):
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except FileNotFoundError:
+                        continue  # evicted by another process meanwhile
+                    found.append((stat.st_mtime, name[:-len(".mp3")], stat.st_size))
+        return sorted(found)
+
+    def _load(self):
+        """Index the entries on disk, least recently used first, replacing the current index."""
+        found = self._scan()
+        with self._lock:
+            self._entries = OrderedDict((key, size) for _, key, size in found)
+            self._bytes = sum(size for _, _, size in found)
+            self._scanned_at = time.monotonic()
+        if found:
+            logger.info(f"Audio cache: {len(found)} entries ({self._bytes / 1024 / 1024:.1f} MiB) in {self.directory}")
+
+    def get(self, key: str, bypass: bool = False) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """
+        Look up an entry.
+
+        Args:
+            key: Cache key from ``make_key``
+            bypass: Count a deliberate skip of the cache and return nothing
+
+        Returns:
+            (audio bytes, metadata) on a hit, None otherwise
+        """
+        with self._lock:
+            if bypass:
+                self.bypassed += 1
+                return None
+
+        entry = self._get_local(key)
+        if entry is None and self.store is not None:
+            entry = self.store.get(key)
+            if entry is not None:
+                self._put_local(key, *entry)
+                with self._lock:
+                    self.store_hits += 1
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def contains(self, key: str) -> bool:
+        """
+        Whether an entry exists, without counting a hit or a miss. An entry found
+        only in the store is copied to the directory, so the ``get`` that usually
+        follows is local.
+        """
+        with self._lock:
+            if key in self._entries:
+                return True
+        audio_path, _ = self._paths(key)
+        if os.path.exists(audio_path):
+            return True
+        if self.store is None:
+            return False
+        entry = self.store.get(key)
+        if entry is None:
+            return False
+        self._put_local(key, *entry)
+        return True
+
+    def _get_local(self, key: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        with self._lock:
+            indexed = key in self._entries
+            if indexed:
+                self._entries.move_to_end(key)
+
+        audio_path, meta_path = self._paths(key)
+        if not indexed:
+            # Possibly written by another process sharing the directory since the index was built
+            try:
+                size = os.path.getsize(audio_path)
+            except OSError:
+                return None
+            with self._lock:
+                self._bytes += size - self._entries.pop(key, 0)
+                self._entries[key] = size
+        try:
+            with open(audio_path, "rb") as f:
+                audio = f.read()
+            with open(meta_path) as f:
+                metadata = json.load(f)
+            os.utime(audio_path)
+        except FileNotFoundError:
+            # Evicted by another process sharing the directory
+            self._remove(key)
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Audio cache entry {key} is unreadable, dropping it: {e}")
+            self._remove(key)
+            return None
+        return audio, metadata
+
+    def put(self, key: str, audio: bytes, metadata: Optional[Dict[str, Any]] = None):
+        """Store audio under ``key``, evicting the least recently used entries if the cache is full."""
+        self._put_local(key, audio, metadata)
+        if self.store is not None:
+            self.store.put(key, audio, metadata or {})
+
+    def _put_local(self, key: str, audio: bytes, metadata: Optional[Dict[str, Any]]):
+        if len(audio) > self.max_bytes:
+            return
+        audio_path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(audio_path), exist_ok=True)
+        # Write the metadata first and the audio last, each atomically: an entry exists once its audio does
+        for path, data in ((meta_path, json.dumps(metadata or {}).encode()), (audio_path, audio)):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        if time.monotonic() - self._scanned_at >= self.rescan_seconds:
+            self._load()
+        with self._lock:
+            self._bytes += len(audio) - self._entries.pop(key, 0)
+            self._entries[key] = len(audio)
+            evicted = []
+            while self._bytes > self.max_bytes and self._entries:
+                old_key, size = self._entries.popitem(last=False)
+                self._bytes -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._delete_files(old_key)
+
+    def _remove(self, key: str):
+        with self._lock:
+            self._bytes -= self._entries.pop(key, 0)
+        self._delete_files(key)
+
+    def _delete_files(self, key: str):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "store_hits": self.store_hits,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes
+            }
@@ -0,0 +1,64 @@
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Key prefix of the cache entries in the bucket
+DEFAULT_PREFIX = "tts-cache/"
+
+
+class S3AudioStore:
+    """
+    Audio cache entries kept in an S3 bucket, shared by every process and dyno.
+
+    Each entry is one MP3 object whose metadata JSON travels in the object's user
+    metadata. The store never evicts; use a lifecycle rule on the bucket to
+    expire old entries. Errors are logged and treated as misses, so an outage
+    of the store only costs provider calls.
+    """
+
+    def __init__(self, bucket: str, prefix: str = DEFAULT_PREFIX, client=None):
+        """
+        Args:
+            bucket: Bucket name
+            prefix: Key prefix of the entries
+            client: boto3 S3 client; built from the standard AWS environment variables when omitted
+        """
+        if client is None:
+            # Imported here so the dependency is only loaded when a bucket is configured
+            import boto3
+            client = boto3.client('s3')
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = client
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}.mp3"
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """(audio bytes, metadata) of an entry, or None."""
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+            audio = response['Body'].read()
+            metadata = json.loads(response.get('Metadata', {}).get('entry') or '{}')
+        except self.client.exceptions.NoSuchKey:
+            return None
+        except Exception as e:
+            logger.warning(f"Audio store lookup of {key} failed: {e}")
+            return None
+        return audio, metadata
+
+    def put(self, key: str, audio: bytes, metadata: Dict[str, Any]):
+        """Store an entry, replacing any previous one."""
+        try:
+            self.client.put_object(
+                Bucket=self.bucket,
+                Key=self._object_key(key),
+                Body=audio,
+                ContentType='audio/mpeg',
+                # User metadata must be ASCII, which json.dumps guarantees by default
+                Metadata={'entry': json.dumps(metadata)}
+            )
+        except Exception as e:
+            logger.warning(f"Audio store write of {key} failed: {e}")
@@ -1,9 +1,17 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 from pydantic import BaseModel
+from models.base_models import ErrorResponse
+import json
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Requests of a batch processed at once when a service sets no limit of its own
+DEFAULT_BATCH_WORKERS = 8
+
 class BaseService(ABC):
     """Base class for all services in the application."""
     
@@ -19,6 +27,60 @@ class BaseService(ABC):
             A Pydantic model containing the processed result
         """
         pass
+
+    async def process_async(self, input_data: BaseModel) -> BaseModel:
+        """
+        Process the input data without blocking the event loop.
+
+        Services with non-blocking provider clients override this; by default
+        ``process`` runs on a worker thread.
+
+        Args:
+            input_data: A Pydantic model containing the input data
+
+        Returns:
+            A Pydantic model containing the processed result
+        """
+        return await asyncio.to_thread(self.process, input_data)
+
+    def process_batch(self, inputs: List[BaseModel], max_workers: Optional[int] = None) -> List[BaseModel]:
+        """
+        Process many inputs concurrently.
+
+        Identical inputs are processed once and share their result. A failing
+        item does not affect the others: its slot holds an ``ErrorResponse``.
+
+        Args:
+            inputs: Input models, e.g. one per sentence
+            max_workers: Items processed at once (defaults to ``batch_workers()``)
+
+        Returns:
+            One result per input, in input order
+        """
+        unique = {}
+        for input_data in inputs:
+            unique.setdefault(self._batch_key(input_data), input_data)
+
+        def run(input_data):
+            try:
+                return self.process(input_data)
+            except Exception as e:
+                logger.error(f"Batch item failed in {self.__class__.__name__}: {e}")
+                return ErrorResponse(error=str(e))
+
+        workers = max(1, min(len(unique), max_workers or self.batch_workers()))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = dict(zip(unique, executor.map(run, unique.values())))
+        logger.info(f"{self.__class__.__name__} processed a batch of {len(inputs)} items ({len(unique)} unique)")
+        return [results[self._batch_key(input_data)] for input_data in inputs]
+
+    def batch_workers(self) -> int:
+        """How many batch items to process at once; services with provider limits override this."""
+        return DEFAULT_BATCH_WORKERS
+
+    def _batch_key(self, input_data: BaseModel) -> str:
+        """Identity of an input within a batch; the request timestamp does not make two inputs different."""
+        return json.dumps(input_data.model_dump(mode='json', exclude={'timestamp'}), sort_keys=True)
     
     def _log_input(self, input_data: BaseModel):
         """Log the input data for debugging purposes."""
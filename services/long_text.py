@@ -0,0 +1,82 @@
+import re
+from typing import Iterable, List
+
+# Sentence ends: the whitespace after terminal punctuation (Latin and CJK) and up to two closing quotes
+# or brackets, which stay with their sentence. Lookbehinds must be fixed-width, hence one per closer count.
+# A closer that cannot open anything may also follow a space (French « Oui. »)
+_TERMINAL = r'[.!?…。！？]'
+_CLOSER = r'["\'”’»)\]]'
+_SENTENCE_END = re.compile(
+    rf'(?:(?<={_TERMINAL})|(?<={_TERMINAL}{_CLOSER})|(?<={_TERMINAL}{_CLOSER}{{2}})|(?<={_TERMINAL}\s{_CLOSER}))'
+    r'\s+(?![”’»)\]])'
+)
+# Fallback split points inside an over-long sentence
+_CLAUSE_END = re.compile(r'(?<=[,;:，；：])\s+')
+
+
+def split_text(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into chunks of at most ``max_chars`` characters on sentence boundaries.
+
+    Consecutive sentences are packed into the same chunk while they fit. A
+    sentence longer than ``max_chars`` is split on clause punctuation, then on
+    whitespace, and only cut mid-word as a last resort.
+
+    Args:
+        text: The text to split
+        max_chars: Largest chunk the provider should receive
+
+    Returns:
+        The chunks, in order, each stripped of surrounding whitespace
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    pieces = []
+    for sentence in _SENTENCE_END.split(text):
+        pieces.extend(_split_long(sentence.strip(), max_chars))
+
+    chunks, current = [], ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    if len(sentence) <= max_chars:
+        return [sentence] if sentence else []
+    for pattern in (_CLAUSE_END, re.compile(r'\s+')):
+        parts = [part for part in pattern.split(sentence) if part]
+        if len(parts) > 1:
+            return [piece for part in parts for piece in _split_long(part, max_chars)]
+    return [sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars)]
+
+
+def _strip_id3(audio: bytes) -> bytes:
+    """Drop a leading ID3v2 tag and a trailing ID3v1 tag, leaving only MP3 frames."""
+    if audio[:3] == b"ID3" and len(audio) >= 10:
+        # The tag size is a 28-bit "synchsafe" integer, excluding the 10-byte header and optional footer
+        size = (audio[6] << 21) | (audio[7] << 14) | (audio[8] << 7) | audio[9]
+        footer = 10 if audio[5] & 0x10 else 0
+        audio = audio[10 + size + footer:]
+    if len(audio) >= 128 and audio[-128:-125] == b"TAG":
+        audio = audio[:-128]
+    return audio
+
+
+def concat_mp3(parts: Iterable[bytes]) -> bytes:
+    """
+    Join MP3 clips into one playable stream.
+
+    MP3 is a sequence of self-contained frames, so clips can be concatenated
+    once their ID3 metadata tags, which would otherwise sit between frames,
+    are removed.
+    """
+    return b"".join(_strip_id3(part) for part in parts)
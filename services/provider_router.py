@@ -0,0 +1,129 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+from metrics import TTS_PROVIDER_REQUESTS, TTS_PROVIDER_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# Provider calls remembered per provider, and how long each is remembered
+DEFAULT_WINDOW_SIZE = 200
+DEFAULT_WINDOW_SECONDS = 5 * 60
+# Error rate above which a provider is only used when no healthy one is left
+DEFAULT_MAX_ERROR_RATE = 0.5
+# Calls needed before a provider's latency or error rate is trusted
+DEFAULT_MIN_SAMPLES = 5
+# Hedge after this many seconds until the primary's own p95 is known
+DEFAULT_HEDGE_AFTER = 3.0
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ProviderRouter:
+    """
+    Rolling latency and error rate of each text-to-speech provider, used to route "auto" requests.
+
+    Every provider call is recorded. ``rank`` orders providers healthy first
+    (error rate at most ``max_error_rate``), then by median latency; a provider
+    with too few recent calls ranks first so it gets probed. Calls older than
+    ``window_seconds`` are forgotten, so a provider that was failing is tried
+    again once its failures have aged out. ``hedge_delay`` is how long to wait
+    for the primary before asking another provider: ``hedge_after`` when set,
+    otherwise the primary's recent p95.
+    """
+
+    def __init__(self, providers: Iterable[str], window_size: int = DEFAULT_WINDOW_SIZE,
+                 window_seconds: float = DEFAULT_WINDOW_SECONDS, max_error_rate: float = DEFAULT_MAX_ERROR_RATE,
+                 hedge_after: Optional[float] = None, min_samples: int = DEFAULT_MIN_SAMPLES):
+        self.window_seconds = window_seconds
+        self.max_error_rate = max_error_rate
+        self.hedge_after = hedge_after
+        self.min_samples = max(1, min_samples)
+        # provider -> (finished at, seconds, ok), oldest first
+        self._calls = {provider: deque(maxlen=window_size) for provider in providers}
+        self._lock = threading.Lock()
+
+    def _recent(self, provider: str, now: float) -> List:
+        calls = self._calls[provider]
+        while calls and calls[0][0] < now - self.window_seconds:
+            calls.popleft()
+        return list(calls)
+
+    def record(self, provider: str, seconds: float, ok: bool, outcome: Optional[str] = None):
+        """Record one provider call and refresh its exported percentiles."""
+        now = time.time()
+        with self._lock:
+            self._calls[provider].append((now, seconds, ok))
+            latencies = sorted(call[1] for call in self._recent(provider, now) if call[2])
+        TTS_PROVIDER_REQUESTS.inc(provider=provider, outcome=outcome or ('ok' if ok else 'error'))
+        for quantile in QUANTILES:
+            value = _percentile(latencies, quantile)
+            if value is not None:
+                TTS_PROVIDER_LATENCY.set(round(value, 4), provider=provider, quantile=quantile)
+
+    @contextmanager
+    def track(self, provider: str):
+        """Record the duration and outcome of the provider call made in the ``with`` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        except asyncio.CancelledError:
+            # A call dropped for a faster hedge took at least this long; without it a slow provider would keep its rank
+            self.record(provider, time.perf_counter() - started, ok=True, outcome='abandoned')
+            raise
+        except Exception:
+            self.record(provider, time.perf_counter() - started, ok=False)
+            raise
+        self.record(provider, time.perf_counter() - started, ok=True)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Recent calls, error rate and latency percentiles (ms) of each provider."""
+        now = time.time()
+        with self._lock:
+            recent = {provider: self._recent(provider, now) for provider in self._calls}
+        stats = {}
+        for provider, calls in recent.items():
+            errors = sum(1 for call in calls if not call[2])
+            latencies = sorted(call[1] for call in calls if call[2])
+            error_rate = errors / len(calls) if calls else None
+            stats[provider] = {
+                'calls': len(calls),
+                'errors': errors,
+                'error_rate': round(error_rate, 3) if error_rate is not None else None,
+                'healthy': len(calls) < self.min_samples or error_rate <= self.max_error_rate,
+                **{
+                    f"p{round(quantile * 100)}_ms": round(_percentile(latencies, quantile) * 1000, 1) if latencies else None
+                    for quantile in QUANTILES
+                }
+            }
+        return stats
+
+    def rank(self, providers: Iterable[str]) -> List[str]:
+        """The given providers, best first."""
+        stats = self.stats()
+
+        def score(provider):
+            entry = stats[provider]
+            if entry['calls'] < self.min_samples:
+                return (0, 0.0)
+            return (0 if entry['healthy'] else 1, entry['p50_ms'] if entry['p50_ms'] is not None else float('inf'))
+
+        return sorted(providers, key=score)
+
+    def hedge_delay(self, provider: str) -> float:
+        """Seconds to wait for ``provider`` before hedging with another one."""
+        if self.hedge_after is not None:
+            return self.hedge_after
+        entry = self.stats()[provider]
+        if entry['calls'] < self.min_samples or entry['p95_ms'] is None:
+            return DEFAULT_HEDGE_AFTER
+        return entry['p95_ms'] / 1000
@@ -1,28 +1,102 @@
-from typing import Dict, Type
+import os
+import threading
+from importlib import import_module
+from typing import Callable, Dict, Optional, Union
 from .base_service import BaseService
-from .text_to_speech_service import TextToSpeechService
+
+# A service instance, a zero-argument callable building one, or a "module:attribute" path to such a callable
+ServiceFactory = Union[BaseService, Callable[[], BaseService], str]
+
+
+def _resolve(factory: ServiceFactory) -> BaseService:
+    if isinstance(factory, BaseService):
+        return factory
+    if isinstance(factory, str):
+        module_name, _, attribute = factory.partition(':')
+        factory = getattr(import_module(module_name), attribute)
+    return factory()
+
 
 class ServiceRegistry:
-    """Registry for all services in the application."""
-    
+    """
+    Registry for all services in the application.
+
+    Services are registered as factories and only built, along with their
+    provider SDKs, on the first ``get``. A factory given as a
+    ``"module:attribute"`` path is not even imported until then, so importing
+    the registry stays cheap. ``list_services`` reports each service's
+    configuration without constructing it.
+    """
+
+    _factories: Dict[str, ServiceFactory] = {}
+    _config_checks: Dict[str, Callable[[], Dict[str, bool]]] = {}
     _services: Dict[str, BaseService] = {}
-    
+    _lock = threading.Lock()
+
     @classmethod
-    def register(cls, name: str, service: BaseService):
-        """Register a new service."""
-        cls._services[name] = service
-    
+    def register(cls, name: str, service: ServiceFactory,
+                 config_status: Optional[Callable[[], Dict[str, bool]]] = None):
+        """
+        Register a new service.
+
+        Args:
+            name: Name the service is fetched by
+            service: The service, a factory building it, or a "module:attribute" path to the factory
+            config_status: Cheap check of the service's configuration (e.g. which API keys are set),
+                used by ``list_services`` before the service is built
+        """
+        with cls._lock:
+            cls._services.pop(name, None)
+            cls._factories[name] = service
+            if config_status:
+                cls._config_checks[name] = config_status
+            if isinstance(service, BaseService):
+                cls._services[name] = service
+
     @classmethod
     def get(cls, name: str) -> BaseService:
-        """Get a service by name."""
-        if name not in cls._services:
+        """Get a service by name, building it on first use."""
+        service = cls._services.get(name)
+        if service is not None:
+            return service
+        if name not in cls._factories:
             raise ValueError(f"Service '{name}' not found in registry")
-        return cls._services[name]
-    
+        with cls._lock:
+            # Built once even when several threads ask for it at the same time
+            if name not in cls._services:
+                cls._services[name] = _resolve(cls._factories[name])
+            return cls._services[name]
+
+    @classmethod
+    def loaded(cls, name: str) -> Optional[BaseService]:
+        """The service if it has been built already, without building it."""
+        return cls._services.get(name)
+
     @classmethod
-    def list_services(cls) -> Dict[str, Type[BaseService]]:
-        """List all registered services."""
-        return cls._services.copy()
+    def list_services(cls) -> Dict[str, Dict]:
+        """
+        List all registered services without building them.
+
+        Returns:
+            For each service name, whether it is ``loaded`` and its ``config`` status
+        """
+        return {
+            name: {
+                'loaded': name in cls._services,
+                'config': cls._config_checks[name]() if name in cls._config_checks else {}
+            }
+            for name in list(cls._factories)
+        }
+
+
+def text_to_speech_config() -> Dict[str, bool]:
+    """Which text-to-speech providers have credentials, read from the environment like the service does."""
+    return {
+        'elevenlabs': bool(os.getenv('ELEVENLABS_API_KEY')),
+        'google': bool(os.getenv('GOOGLE_APPLICATION_CREDENTIALS'))
+    }
+
 
 # Register the Text-to-Speech service
-ServiceRegistry.register('text_to_speech', TextToSpeechService()) 
\ No newline at end of file
+ServiceRegistry.register('text_to_speech', 'services.text_to_speech_service:TextToSpeechService',
+                         config_status=text_to_speech_config)
@@ -1,23 +1,55 @@
 import os
+import asyncio
 import logging
-from typing import Optional, Dict, List
-from elevenlabs import generate, set_api_key, voices, Voice
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager, asynccontextmanager
+from typing import Optional, Dict, Iterator, List
+from elevenlabs import generate, set_api_key, voices
 from google.cloud import texttospeech
 from .base_service import BaseService
+from .audio_cache import AudioCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from .audio_store import S3AudioStore, DEFAULT_PREFIX
+from .voice_catalog import VoiceCatalog, DEFAULT_TTL_SECONDS, DEFAULT_WARM_TIMEOUT
+from .long_text import split_text, concat_mp3
+from .provider_router import ProviderRouter, DEFAULT_MAX_ERROR_RATE
+from metrics import TTS_HEDGED
+from models.base_models import ErrorResponse
 from models.service_models import TextToSpeechRequest, TextToSpeechResponse, SUPPORTED_LANGUAGES
+from rate_limiter import TokenBucket
 
 logger = logging.getLogger(__name__)
 
+# Requests in flight, requests per second and characters per request allowed per provider,
+# overridable with TTS_<PROVIDER>_CONCURRENCY, TTS_<PROVIDER>_RATE and TTS_<PROVIDER>_CHUNK_CHARS.
+# Longer texts are split into chunks synthesized in parallel; Google caps input at 5000 bytes
+DEFAULT_PROVIDER_LIMITS = {
+    'elevenlabs': {'concurrency': 3, 'rate': 2.0, 'chunk_chars': 800},
+    'google': {'concurrency': 8, 'rate': 15.0, 'chunk_chars': 1000}
+}
+
+# Size of the chunks yielded when streaming audio that is already complete (cache hits, Google)
+STREAM_CHUNK_SIZE = 16 * 1024
+
 class TextToSpeechService(BaseService):
     """Service for converting text to speech using various providers."""
     
-    def __init__(self):
-        """Initialize the service with API keys."""
+    def __init__(self, cache: Optional[AudioCache] = None):
+        """
+        Initialize the service with API keys.
+
+        Args:
+            cache: Audio cache to serve repeated requests from; built from ``TTS_CACHE_DIR``
+                and ``TTS_CACHE_MAX_MB`` (shared through ``TTS_CACHE_S3_BUCKET`` if set) when omitted,
+                and disabled by ``TTS_CACHE_DISABLED``
+        """
         self.elevenlabs_api_key = os.getenv('ELEVENLABS_API_KEY')
         if self.elevenlabs_api_key:
             set_api_key(self.elevenlabs_api_key)
         
-        # Initialize Google Cloud client if credentials are available
+        # Initialize Google Cloud client if credentials are available. Async clients are bound to
+        # the event loop they were created on, so one is created lazily per loop (see _google_async_client)
+        self._google_async_clients = {}  # loop -> (client, async generator closing it)
         self.google_client = None
         if os.getenv('GOOGLE_APPLICATION_CREDENTIALS'):
             try:
@@ -25,45 +57,57 @@ class TextToSpeechService(BaseService):
             except Exception as e:
                 logger.error(f"Failed to initialize Google Cloud client: {e}")
         
-        # Cache for available voices
-        self._available_voices: Dict[str, List[Voice]] = {}
-    
-    def _get_available_voices(self) -> Dict[str, List[Voice]]:
-        """Get and cache available voices from ElevenLabs."""
-        if not self._available_voices:
-            try:
-                voices_list = voices()
-                # Group voices by language
-                for voice in voices_list:
-                    lang = voice.labels.get('language', 'unknown')
-                    if lang not in self._available_voices:
-                        self._available_voices[lang] = []
-                    self._available_voices[lang].append(voice)
-            except Exception as e:
-                logger.error(f"Error getting ElevenLabs voices: {e}")
-                return {}
-        return self._available_voices
+        # ElevenLabs voices by (language, gender), loaded and refreshed in the background
+        self.voice_catalog = VoiceCatalog(voices, ttl=float(os.getenv('TTS_VOICE_CATALOG_TTL', DEFAULT_TTL_SECONDS)))
+        self.voice_catalog_wait = float(os.getenv('TTS_VOICE_CATALOG_WAIT', DEFAULT_WARM_TIMEOUT))
+        if self.elevenlabs_api_key:
+            self.voice_catalog.start()
+
+        # Per-provider limits, shared by single and batch requests
+        self._provider_concurrency: Dict[str, int] = {}
+        self._provider_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._provider_rates: Dict[str, TokenBucket] = {}
+        self._provider_chunk_chars: Dict[str, int] = {}
+        for provider, limits in DEFAULT_PROVIDER_LIMITS.items():
+            prefix = f"TTS_{provider.upper()}"
+            concurrency = max(1, int(os.getenv(f"{prefix}_CONCURRENCY", limits['concurrency'])))
+            self._provider_concurrency[provider] = concurrency
+            self._provider_slots[provider] = threading.BoundedSemaphore(concurrency)
+            self._provider_rates[provider] = TokenBucket(float(os.getenv(f"{prefix}_RATE", limits['rate'])))
+            self._provider_chunk_chars[provider] = max(1, int(os.getenv(f"{prefix}_CHUNK_CHARS", limits['chunk_chars'])))
+
+        if cache is None and os.getenv('TTS_CACHE_DISABLED', '').lower() not in ('1', 'true', 'yes'):
+            # The web app and the sync worker's pre-generation share audio through the bucket
+            bucket = os.getenv('TTS_CACHE_S3_BUCKET')
+            cache = AudioCache(
+                os.getenv('TTS_CACHE_DIR', DEFAULT_CACHE_DIR),
+                max_bytes=int(float(os.getenv('TTS_CACHE_MAX_MB', DEFAULT_MAX_BYTES / 1024 / 1024)) * 1024 * 1024),
+                store=S3AudioStore(bucket, os.getenv('TTS_CACHE_S3_PREFIX', DEFAULT_PREFIX)) if bucket else None
+            )
+        self.cache = cache
+
+        # Rolling latency and error rate of each provider, used to route and hedge "auto" requests.
+        # TTS_HEDGE_AFTER_MS fixes the hedge threshold; by default it follows the primary's p95
+        hedge_after = os.getenv('TTS_HEDGE_AFTER_MS')
+        self.router = ProviderRouter(
+            DEFAULT_PROVIDER_LIMITS,
+            max_error_rate=float(os.getenv('TTS_MAX_ERROR_RATE', DEFAULT_MAX_ERROR_RATE)),
+            hedge_after=float(hedge_after) / 1000 if hedge_after else None
+        )
+        # Runs the racing provider calls of auto requests; each request uses at most one thread per provider
+        self._hedge_pool = ThreadPoolExecutor(max_workers=len(DEFAULT_PROVIDER_LIMITS) * self.batch_workers(),
+                                              thread_name_prefix="tts-hedge")
     
     def _get_elevenlabs_voice(self, language_code: str, gender: str) -> Optional[str]:
         """Get the appropriate ElevenLabs voice ID based on language and gender."""
-        try:
-            available_voices = self._get_available_voices()
-            lang_voices = available_voices.get(language_code, [])
-            
-            # Filter voices by gender
-            matching_voices = [
-                voice for voice in lang_voices
-                if voice.labels.get('gender') == gender
-            ]
-            
-            if not matching_voices:
-                logger.warning(f"No voices found for {language_code} {gender}")
-                return None
-                
-            return matching_voices[0].voice_id
-        except Exception as e:
-            logger.error(f"Error getting ElevenLabs voices: {e}")
+        # The service is built on first use, so the first requests wait for the catalog's first fetch
+        if not self.voice_catalog.loaded and not self.voice_catalog.warm(self.voice_catalog_wait):
+            logger.warning(f"Voice catalog not loaded, no voice for {language_code} {gender} yet")
             return None
+        voice_id = self.voice_catalog.lookup(language_code, gender)
+        if not voice_id:
+            logger.warning(f"No voices found for {language_code} {gender}")
+        return voice_id
     
     def _generate_with_elevenlabs(self, request: TextToSpeechRequest) -> TextToSpeechResponse:
         """Generate speech using ElevenLabs API."""
@@ -98,45 +142,149 @@ class TextToSpeechService(BaseService):
             raise ValueError("Google Cloud client not initialized")
         
         try:
-            synthesis_input = texttospeech.SynthesisInput(text=request.text)
-            
-            # Map gender to SSML gender
-            ssml_gender = (
-                texttospeech.SsmlVoiceGender.FEMALE
-                if request.gender == 'female'
-                else texttospeech.SsmlVoiceGender.MALE
-            )
-            
-            voice = texttospeech.VoiceSelectionParams(
-                language_code=request.language_code,
-                ssml_gender=ssml_gender
-            )
-            
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3
-            )
-            
-            response = self.google_client.synthesize_speech(
-                input=synthesis_input,
-                voice=voice,
-                audio_config=audio_config
-            )
-            
-            return TextToSpeechResponse(
-                audio_content=response.audio_content,
-                audio_format="mp3",
-                voice_id=f"{request.language_code}-{request.gender}",
-                provider="google",
-                language_code=request.language_code,
-                gender=request.gender
-            )
+            response = self.google_client.synthesize_speech(**self._google_synthesis_args(request))
+            return self._google_response(request, response)
         except Exception as e:
             logger.error(f"Google Cloud TTS error: {e}")
             raise
+
+    async def _generate_with_google_async(self, request: TextToSpeechRequest) -> TextToSpeechResponse:
+        """Generate speech using the non-blocking Google Cloud TTS client."""
+        client = await self._google_async_client()
+        try:
+            response = await client.synthesize_speech(**self._google_synthesis_args(request))
+            return self._google_response(request, response)
+        except Exception as e:
+            logger.error(f"Google Cloud TTS error: {e}")
+            raise
+
+    async def _google_async_client(self):
+        """
+        The running loop's async Google client, created on first use and closed when the loop shuts down.
+
+        ``run_sync`` (``asyncio.run``) runs every call on a fresh loop, so without
+        closing, each call would leak a gRPC channel. The client is closed from an
+        async generator registered with the loop, which ``asyncio.run`` finalizes
+        (``shutdown_asyncgens``) before closing the loop.
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._google_async_clients.get(loop)
+        if entry is not None:
+            return entry[0]
+        # Loops closed without finalizing their async generators can no longer close their client
+        for closed in [other for other in list(self._google_async_clients) if other.is_closed()]:
+            self._google_async_clients.pop(closed, None)
+
+        client = texttospeech.TextToSpeechAsyncClient()
+        closer = self._close_on_shutdown(loop, client)
+        self._google_async_clients[loop] = (client, closer)
+        # The first step registers the generator with the loop's shutdown hooks
+        await closer.__anext__()
+        return client
+
+    async def _close_on_shutdown(self, loop, client):
+        try:
+            yield
+        finally:
+            self._google_async_clients.pop(loop, None)
+            await client.transport.close()
+
+    @staticmethod
+    def _google_synthesis_args(request: TextToSpeechRequest) -> Dict:
+        synthesis_input = texttospeech.SynthesisInput(text=request.text)
+
+        # Map gender to SSML gender
+        ssml_gender = (
+            texttospeech.SsmlVoiceGender.FEMALE
+            if request.gender == 'female'
+            else texttospeech.SsmlVoiceGender.MALE
+        )
+
+        voice = texttospeech.VoiceSelectionParams(
+            language_code=request.language_code,
+            ssml_gender=ssml_gender
+        )
+
+        audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.MP3
+        )
+        return {'input': synthesis_input, 'voice': voice, 'audio_config': audio_config}
+
+    @staticmethod
+    def _google_response(request: TextToSpeechRequest, response) -> TextToSpeechResponse:
+        return TextToSpeechResponse(
+            audio_content=response.audio_content,
+            audio_format="mp3",
+            voice_id=f"{request.language_code}-{request.gender}",
+            provider="google",
+            language_code=request.language_code,
+            gender=request.gender
+        )
     
+    @contextmanager
+    def _provider_slot(self, provider: str):
+        """Hold one of the provider's in-flight slots and spend one request of its rate budget."""
+        with self._provider_slots[provider]:
+            self._provider_rates[provider].acquire()
+            yield
+
+    @asynccontextmanager
+    async def _provider_slot_async(self, provider: str):
+        """``_provider_slot`` for coroutines: waits for the slot and the rate budget without blocking the loop."""
+        slot = self._provider_slots[provider]
+        # The semaphore is shared with sync callers, so a contended slot is awaited on a worker thread
+        if not slot.acquire(blocking=False):
+            acquiring = asyncio.ensure_future(asyncio.to_thread(slot.acquire))
+            try:
+                await asyncio.shield(acquiring)
+            except asyncio.CancelledError:
+                # The thread still gets the slot eventually; hand it straight back
+                acquiring.add_done_callback(lambda _: slot.release())
+                raise
+        try:
+            bucket = self._provider_rates[provider]
+            wait = bucket.try_acquire()
+            while wait:
+                await asyncio.sleep(wait)
+                wait = bucket.try_acquire()
+            yield
+        finally:
+            slot.release()
+
+    def batch_workers(self) -> int:
+        """Enough workers to keep every provider at its in-flight limit."""
+        return sum(self._provider_concurrency.values())
+
+    def _cache_key(self, request: TextToSpeechRequest) -> Optional[str]:
+        if not self.cache:
+            return None
+        return AudioCache.make_key(
+            request.text, request.language_code, request.gender,
+            request.provider, request.voice_id, request.model
+        )
+
+    def _store_in_cache(self, cache_key: Optional[str], audio: bytes, metadata: Dict):
+        """Cache synthesized audio; a failed write is logged and never fails the request."""
+        if not cache_key:
+            return
+        try:
+            self.cache.put(cache_key, audio, metadata)
+        except OSError as e:
+            logger.warning(f"Could not cache synthesized audio: {e}")
+
+    def cache_stats(self) -> Optional[Dict]:
+        """Hit ratio and size of the audio cache, or None when caching is disabled."""
+        return self.cache.stats() if self.cache else None
+
     def process(self, input_data: TextToSpeechRequest) -> TextToSpeechResponse:
         """
         Process the text-to-speech request.
+
+        Audio already synthesized with the same parameters is served from the
+        audio cache without calling the provider, unless ``bypass_cache`` is set.
+        Texts longer than the provider's chunk size are synthesized in chunks
+        (see ``_process_long_text``). The "auto" provider picks the provider
+        and hedges slow calls (see ``_process_auto``).
         
         Args:
             input_data: TextToSpeechRequest containing text and parameters
@@ -144,21 +292,372 @@ class TextToSpeechService(BaseService):
         Returns:
             TextToSpeechResponse with audio content
         """
+        if input_data.provider == 'auto':
+            return self._process_auto(input_data)
+
         self._log_input(input_data)
-        
+
+        max_chars = self._provider_chunk_chars.get(input_data.provider)
+        if max_chars and len(input_data.text) > max_chars:
+            return self._process_long_text(input_data, max_chars)
+
+        cache_key = self._cache_key(input_data)
+        result = self._cached_response(input_data, cache_key)
+        if result:
+            self._log_output(result)
+            return result
+
         try:
+            self._check_provider_configured(input_data.provider)
             if input_data.provider == 'elevenlabs':
-                if not self.elevenlabs_api_key:
-                    raise ValueError("ElevenLabs API key not configured")
-                result = self._generate_with_elevenlabs(input_data)
+                with self._provider_slot('elevenlabs'), self.router.track('elevenlabs'):
+                    result = self._generate_with_elevenlabs(input_data)
             else:  # google
-                if not self.google_client:
-                    raise ValueError("Google Cloud credentials not configured")
-                result = self._generate_with_google(input_data)
-            
+                with self._provider_slot('google'), self.router.track('google'):
+                    result = self._generate_with_google(input_data)
+
+            self._store_result(cache_key, result)
             self._log_output(result)
             return result
             
         except Exception as e:
             logger.error(f"Text-to-speech error: {e}")
-            raise 
\ No newline at end of file
+            raise
+
+    async def process_async(self, input_data: TextToSpeechRequest) -> TextToSpeechResponse:
+        """
+        Process the text-to-speech request without blocking the event loop.
+
+        Same behavior as ``process``, but Google requests go through the
+        non-blocking client and provider limits are awaited rather than blocked
+        on, so one event loop can keep many syntheses in flight. The ElevenLabs
+        SDK has no async API, so its calls run on a worker thread.
+
+        Args:
+            input_data: TextToSpeechRequest containing text and parameters
+
+        Returns:
+            TextToSpeechResponse with audio content
+        """
+        if input_data.provider == 'auto':
+            return await self._process_auto_async(input_data)
+
+        self._log_input(input_data)
+
+        max_chars = self._provider_chunk_chars.get(input_data.provider)
+        if max_chars and len(input_data.text) > max_chars:
+            return await self._process_long_text_async(input_data, max_chars)
+
+        cache_key = self._cache_key(input_data)
+        # Off the loop: a miss on local disk may be looked up in the shared audio store
+        result = await asyncio.to_thread(self._cached_response, input_data, cache_key)
+        if result:
+            self._log_output(result)
+            return result
+
+        try:
+            self._check_provider_configured(input_data.provider)
+            if input_data.provider == 'elevenlabs':
+                async with self._provider_slot_async('elevenlabs'):
+                    with self.router.track('elevenlabs'):
+                        result = await asyncio.to_thread(self._generate_with_elevenlabs, input_data)
+            else:  # google
+                async with self._provider_slot_async('google'):
+                    with self.router.track('google'):
+                        result = await self._generate_with_google_async(input_data)
+
+            await asyncio.to_thread(self._store_result, cache_key, result)
+            self._log_output(result)
+            return result
+
+        except Exception as e:
+            logger.error(f"Text-to-speech error: {e}")
+            raise
+
+    def _process_auto(self, input_data: TextToSpeechRequest) -> TextToSpeechResponse:
+        """
+        Synthesize with the best configured provider, hedging with the next one when it is slow.
+
+        Providers are tried in ``ProviderRouter.rank`` order. If the primary has
+        not answered within the router's hedge delay, the same request is sent
+        to the next provider and whichever succeeds first is returned; a
+        provider that fails hands over to the next one right away. The response
+        names the provider that produced the audio.
+        """
+        requests = self._auto_requests(input_data)
+        pending = {}
+
+        def launch():
+            request = requests.pop(0)
+            pending[self._hedge_pool.submit(self.process, request)] = request.provider
+
+        hedge_delay = self.router.hedge_delay(requests[0].provider)
+        launch()
+        hedged, errors = False, []
+        while pending:
+            done, _ = wait(pending, timeout=hedge_delay if requests else None, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                logger.info(f"{pending[next(iter(pending))]} slower than {hedge_delay:.2f}s, hedging with {requests[0].provider}")
+                launch()
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append((provider, e))
+                    continue
+                if hedged:
+                    TTS_HEDGED.inc(winner=provider)
+                return result
+            if not pending and requests:
+                launch()
+        raise self._auto_error(errors)
+
+    async def _process_auto_async(self, input_data: TextToSpeechRequest) -> TextToSpeechResponse:
+        """``_process_auto`` on the event loop; the losing provider call is cancelled."""
+        # Off the loop: finding the cached provider may read the disk or the shared audio store
+        requests = await asyncio.to_thread(self._auto_requests, input_data)
+        pending = {}
+
+        def launch():
+            request = requests.pop(0)
+            pending[asyncio.ensure_future(self.process_async(request))] = request.provider
+
+        hedge_delay = self.router.hedge_delay(requests[0].provider)
+        launch()
+        hedged, errors = False, []
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay if requests else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    logger.info(f"{pending[next(iter(pending))]} slower than {hedge_delay:.2f}s, hedging with {requests[0].provider}")
+                    launch()
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception():
+                        errors.append((provider, task.exception()))
+                        continue
+                    if hedged:
+                        TTS_HEDGED.inc(winner=provider)
+                    return task.result()
+                if not pending and requests:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise self._auto_error(errors)
+
+    def _configured_providers(self) -> List[str]:
+        providers = []
+        if self.elevenlabs_api_key:
+            providers.append('elevenlabs')
+        if self.google_client:
+            providers.append('google')
+        return providers
+
+    def _auto_requests(self, input_data: TextToSpeechRequest) -> List[TextToSpeechRequest]:
+        """
+        The request addressed to each configured provider, best provider first.
+
+        A provider whose audio for the request is already cached (e.g. pre-generated
+        by the sync worker with whichever provider was best there) comes first,
+        whatever its rank, so auto requests find audio cached under any provider.
+        """
+        providers = self.router.rank(self._configured_providers())
+        if not providers:
+            raise ValueError("No text-to-speech provider configured")
+        requests = [input_data.model_copy(update={'provider': provider}) for provider in providers]
+        if self.cache and not input_data.bypass_cache:
+            cached = next((request for request in requests if self.cache.contains(self._cache_key(request))), None)
+            if cached is not None:
+                requests.remove(cached)
+                requests.insert(0, cached)
+        return requests
+
+    @staticmethod
+    def _auto_error(errors: List) -> Exception:
+        """The error to raise when every provider failed: the provider's own when only one was tried."""
+        if len(errors) == 1:
+            return errors[0][1]
+        return RuntimeError("All text-to-speech providers failed: " +
+                            "; ".join(f"{provider}: {error}" for provider, error in errors))
+
+    def provider_stats(self) -> Dict[str, Dict]:
+        """Rolling call count, error rate and latency percentiles of each provider."""
+        return self.router.stats()
+
+    def _check_provider_configured(self, provider: str):
+        if provider == 'elevenlabs' and not self.elevenlabs_api_key:
+            raise ValueError("ElevenLabs API key not configured")
+        if provider == 'google' and not self.google_client:
+            raise ValueError("Google Cloud credentials not configured")
+
+    def _cached_response(self, input_data: TextToSpeechRequest, cache_key: Optional[str]) -> Optional[TextToSpeechResponse]:
+        """The response for a cache hit on ``cache_key``, or None."""
+        if not cache_key:
+            return None
+        cached = self.cache.get(cache_key, bypass=input_data.bypass_cache)
+        if not cached:
+            return None
+        audio, metadata = cached
+        return TextToSpeechResponse(
+            audio_content=audio,
+            audio_format=metadata.get("audio_format", "mp3"),
+            voice_id=metadata.get("voice_id"),
+            duration_ms=metadata.get("duration_ms"),
+            provider=input_data.provider,
+            language_code=input_data.language_code,
+            gender=input_data.gender,
+            cached=True
+        )
+
+    def _store_result(self, cache_key: Optional[str], result: TextToSpeechResponse):
+        self._store_in_cache(cache_key, result.audio_content, {
+            "audio_format": result.audio_format,
+            "voice_id": result.voice_id,
+            "duration_ms": result.duration_ms
+        })
+
+    def _process_long_text(self, input_data: TextToSpeechRequest, max_chars: int) -> TextToSpeechResponse:
+        """
+        Synthesize a long text as sentence-aligned chunks in parallel and join the audio.
+
+        Each chunk goes through ``process`` as a batch item, so chunks are cached
+        individually and share the provider limits; the passage takes about as
+        long as its slowest chunk rather than the sum of all of them.
+        """
+        chunk_requests = self._chunk_requests(input_data, max_chars)
+        parts = self.process_batch(chunk_requests)
+        return self._join_chunks(input_data, parts)
+
+    async def _process_long_text_async(self, input_data: TextToSpeechRequest, max_chars: int) -> TextToSpeechResponse:
+        """``_process_long_text`` with the chunks synthesized concurrently on the event loop."""
+        # Off the loop: resolving the voice may wait for the voice catalog's first load
+        chunk_requests = await asyncio.to_thread(self._chunk_requests, input_data, max_chars)
+        # Repeated chunks (refrains, boilerplate) are synthesized once
+        unique = {}
+        for request in chunk_requests:
+            unique.setdefault(request.text, request)
+        outcomes = await asyncio.gather(
+            *(self.process_async(request) for request in unique.values()), return_exceptions=True
+        )
+        by_text = {
+            text: ErrorResponse(error=str(outcome)) if isinstance(outcome, Exception) else outcome
+            for text, outcome in zip(unique, outcomes)
+        }
+        return self._join_chunks(input_data, [by_text[request.text] for request in chunk_requests])
+
+    def _chunk_requests(self, input_data: TextToSpeechRequest, max_chars: int) -> List[TextToSpeechRequest]:
+        """One request per sentence-aligned chunk of the text, all with the same voice."""
+        voice_id = input_data.voice_id
+        if input_data.provider == 'elevenlabs' and not voice_id:
+            # Resolve the voice once so a catalog refresh cannot switch voices mid-passage
+            voice_id = self._get_elevenlabs_voice(input_data.language_code, input_data.gender)
+            if not voice_id:
+                raise ValueError(f"No suitable voice found for {input_data.language_code} {input_data.gender}")
+        return [
+            input_data.model_copy(update={'text': chunk, 'voice_id': voice_id})
+            for chunk in split_text(input_data.text, max_chars)
+        ]
+
+    def _join_chunks(self, input_data: TextToSpeechRequest, parts: List) -> TextToSpeechResponse:
+        """Concatenate the chunks' audio into one response, or raise if any chunk failed."""
+        failed = [part for part in parts if isinstance(part, ErrorResponse)]
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {len(parts)} text chunks failed: {failed[0].error}")
+
+        durations = [part.duration_ms for part in parts]
+        result = TextToSpeechResponse(
+            audio_content=concat_mp3(part.audio_content for part in parts),
+            audio_format="mp3",
+            voice_id=parts[0].voice_id,
+            duration_ms=sum(durations) if None not in durations else None,
+            provider=input_data.provider,
+            language_code=input_data.language_code,
+            gender=input_data.gender,
+            cached=all(part.cached for part in parts)
+        )
+        logger.info(f"Synthesized {len(input_data.text)} characters as {len(parts)} chunks")
+        self._log_output(result)
+        return result
+
+    def stream(self, input_data: TextToSpeechRequest) -> Iterator[bytes]:
+        """
+        Synthesize speech and return an iterator over MP3 chunks.
+
+        With ElevenLabs, chunks are yielded as the provider produces them, so
+        playback can start long before the clip is complete. Google Cloud TTS
+        only returns whole clips, and cache hits are already complete; both are
+        yielded in ``STREAM_CHUNK_SIZE`` chunks. A fully streamed clip is stored
+        in the audio cache. Texts longer than the provider's chunk size go
+        through ``_process_long_text`` and are sent once all chunks are done.
+        Configuration errors are raised by this call, before the first chunk, so
+        callers can still report them.
+
+        Args:
+            input_data: TextToSpeechRequest containing text and parameters
+
+        Returns:
+            An iterator of MP3 byte chunks
+        """
+        if input_data.provider == 'auto':
+            # Audio already sent to the client cannot be swapped for a hedge's, so streams only use the routing
+            input_data = self._auto_requests(input_data)[0]
+
+        self._log_input(input_data)
+
+        max_chars = self._provider_chunk_chars.get(input_data.provider)
+        if max_chars and len(input_data.text) > max_chars:
+            return self._chunked(self._process_long_text(input_data, max_chars).audio_content)
+
+        cache_key = self._cache_key(input_data)
+        if cache_key:
+            cached = self.cache.get(cache_key, bypass=input_data.bypass_cache)
+            if cached:
+                return self._chunked(cached[0])
+
+        if input_data.provider == 'elevenlabs':
+            if not self.elevenlabs_api_key:
+                raise ValueError("ElevenLabs API key not configured")
+            voice_id = input_data.voice_id or self._get_elevenlabs_voice(
+                input_data.language_code, input_data.gender
+            )
+            if not voice_id:
+                raise ValueError(f"No suitable voice found for {input_data.language_code} {input_data.gender}")
+
+            def produce():
+                return generate(text=input_data.text, voice=voice_id, model=input_data.model, stream=True)
+        else:  # google
+            if not self.google_client:
+                raise ValueError("Google Cloud credentials not configured")
+            voice_id = f"{input_data.language_code}-{input_data.gender}"
+
+            def produce():
+                return self._chunked(self._generate_with_google(input_data).audio_content)
+
+        return self._stream_from_provider(input_data.provider, produce, cache_key, voice_id)
+
+    def _stream_from_provider(self, provider: str, produce, cache_key: Optional[str], voice_id: str) -> Iterator[bytes]:
+        """Yield the provider's chunks, holding a provider slot until the stream ends."""
+        chunks = []
+        try:
+            with self._provider_slot(provider), self.router.track(provider):
+                for chunk in produce():
+                    if chunk:
+                        chunks.append(chunk)
+                        yield chunk
+        except Exception as e:
+            logger.error(f"Text-to-speech streaming error: {e}")
+            raise
+        # Only reached when the client consumed the whole stream
+        self._store_in_cache(cache_key, b"".join(chunks), {"audio_format": "mp3", "voice_id": voice_id})
+
+    @staticmethod
+    def _chunked(audio: bytes) -> Iterator[bytes]:
+        for start in range(0, len(audio), STREAM_CHUNK_SIZE):
+            yield audio[start:start + STREAM_CHUNK_SIZE]
@@ -0,0 +1,141 @@
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How long a fetched voice list is used before it is refreshed
+DEFAULT_TTL_SECONDS = 60 * 60
+# Wait before retrying after a failed fetch
+DEFAULT_RETRY_SECONDS = 60
+# How long a lookup before the first load waits for it
+DEFAULT_WARM_TIMEOUT = 10
+
+
+class VoiceCatalog:
+    """
+    In-memory catalog of provider voices, indexed by (language, gender).
+
+    The voice list is fetched off the request path: ``start()`` loads it on a
+    background thread and refreshes it every ``ttl`` seconds, keeping the
+    previous list if a refresh fails. Fetches are single-flight, so concurrent
+    triggers never fetch twice. ``lookup`` is a dict access on the current
+    snapshot and never waits for a fetch; it returns None until the first
+    fetch has completed (``warm`` blocks until then, e.g. before the first request).
+    """
+
+    def __init__(self, fetch: Callable[[], Iterable], ttl: float = DEFAULT_TTL_SECONDS,
+                 retry_interval: float = DEFAULT_RETRY_SECONDS):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._index: Dict[Tuple[str, str], List[str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._attempted = threading.Event()  # set once the first fetch has succeeded or failed
+        self._fetching = False
+        self._thread: Optional[threading.Thread] = None
+        self.fetches = 0
+        self.failures = 0
+
+    @staticmethod
+    def _keys(language: str, gender: str) -> List[Tuple[str, str]]:
+        """Index keys for a voice: the full language tag and its primary subtag ('fr-FR' and 'fr')."""
+        language = (language or 'unknown').lower()
+        gender = (gender or 'unknown').lower()
+        primary = language.split('-')[0]
+        return [(language, gender)] if primary == language else [(language, gender), (primary, gender)]
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded.is_set()
+
+    def refresh(self) -> bool:
+        """
+        Fetch the voice list and swap in a new index, unless a fetch is already running.
+
+        Returns:
+            True if this call fetched successfully
+        """
+        with self._lock:
+            if self._fetching:
+                return False
+            self._fetching = True
+        try:
+            index: Dict[Tuple[str, str], List[str]] = {}
+            for voice in self.fetch():
+                labels = voice.labels or {}
+                for key in self._keys(labels.get('language'), labels.get('gender')):
+                    index.setdefault(key, []).append(voice.voice_id)
+            with self._lock:
+                self._index = index
+                self._loaded_at = time.time()
+                self.fetches += 1
+            self._loaded.set()
+            logger.info(f"Voice catalog refreshed: {self._voice_count(index)} voices")
+            return True
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            logger.error(f"Error refreshing voice catalog: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._fetching = False
+            self._attempted.set()
+
+    def start(self):
+        """Load the catalog and keep it fresh on a background thread."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="voice-catalog", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            ok = self.refresh()
+            time.sleep(self.ttl if ok else self.retry_interval)
+
+    def warm(self, timeout: Optional[float] = None) -> bool:
+        """
+        Start the catalog if needed and wait for its first fetch to finish.
+
+        Once a fetch has failed this returns at once; waiting for the retry would
+        only hold the caller up.
+
+        Returns:
+            Whether the catalog is loaded
+        """
+        self.start()
+        self._attempted.wait(timeout)
+        return self.loaded
+
+    def lookup(self, language_code: str, gender: str) -> Optional[str]:
+        """The first voice for the language and gender, or None. Never waits for a fetch."""
+        if not self.loaded:
+            # Someone forgot to start the catalog; load it in the background for the next request
+            self.start()
+            return None
+        for key in self._keys(language_code, gender):
+            voice_ids = self._index.get(key)
+            if voice_ids:
+                return voice_ids[0]
+        return None
+
+    @staticmethod
+    def _voice_count(index) -> int:
+        return len({voice_id for voice_ids in index.values() for voice_id in voice_ids})
+
+    def stats(self) -> Dict:
+        with self._lock:
+            age = time.time() - self._loaded_at if self._loaded_at else None
+            return {
+                'loaded': self.loaded,
+                'voices': self._voice_count(self._index),
+                'age_seconds': round(age) if age is not None else None,
+                'fetches': self.fetches,
+                'failures': self.failures
+            }
@@ -0,0 +1,176 @@
+import sqlite3
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default location of the sync state database, relative to the worker's working directory
+DEFAULT_STATE_PATH = "sync_state.db"
+
+
+class SyncStateStore:
+    """
+    SQLite-backed memory of the last sync of each Clients row.
+
+    For every row it keeps the last sentence count, the student doc's ``updatedAt``
+    at the time of that count, when the row was last synced, when its count last
+    changed and when it is next due, so a new pass can skip docs that have not
+    changed or are not due yet. It also keeps the circuit breaker's failure
+    record of each student doc, and the Coda sync token of each sentences
+    table scanned for audio pre-generation. The database lives on disk and survives
+    worker restarts; pass ``":memory:"`` for a throwaway store.
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS client_state (
+                    row_id TEXT PRIMARY KEY,
+                    student_doc_id TEXT,
+                    sentences_table_id TEXT,
+                    last_count INTEGER,
+                    doc_updated_at TEXT,
+                    last_synced_at REAL,
+                    last_changed_at REAL,
+                    next_due_at REAL
+                )
+            """)
+            # Databases created before adaptive polling lack the scheduling columns
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(client_state)")}
+            for column in ('last_changed_at', 'next_due_at'):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE client_state ADD COLUMN {column} REAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS doc_failures (
+                    student_doc_id TEXT PRIMARY KEY,
+                    failures INTEGER,
+                    last_error TEXT,
+                    quarantined_until REAL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS table_sync_tokens (
+                    table_key TEXT PRIMARY KEY,
+                    sync_token TEXT,
+                    updated_at REAL
+                )
+            """)
+
+    def get_many(self, row_ids):
+        """Return the stored state of the given rows as a dict keyed by row_id."""
+        row_ids = [row_id for row_id in row_ids if row_id]
+        if not row_ids:
+            return {}
+        placeholders = ",".join("?" for _ in row_ids)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT row_id, student_doc_id, sentences_table_id, last_count, doc_updated_at, last_synced_at, "
+                f"last_changed_at, next_due_at "
+                f"FROM client_state WHERE row_id IN ({placeholders})",
+                row_ids
+            )
+            rows = cursor.fetchall()
+        return {
+            row[0]: {
+                'student_doc_id': row[1],
+                'sentences_table_id': row[2],
+                'last_count': row[3],
+                'doc_updated_at': row[4],
+                'last_synced_at': row[5],
+                'last_changed_at': row[6],
+                'next_due_at': row[7]
+            }
+            for row in rows
+        }
+
+    def record_many(self, entries):
+        """
+        Store the outcome of a batch of row syncs.
+
+        Args:
+            entries: Iterable of (row_id, student_doc_id, sentences_table_id, count, doc_updated_at,
+                last_changed_at, next_due_at)
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO client_state
+                    (row_id, student_doc_id, sentences_table_id, last_count, doc_updated_at,
+                     last_changed_at, next_due_at, last_synced_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(row_id) DO UPDATE SET
+                    student_doc_id = excluded.student_doc_id,
+                    sentences_table_id = excluded.sentences_table_id,
+                    last_count = excluded.last_count,
+                    doc_updated_at = excluded.doc_updated_at,
+                    last_changed_at = excluded.last_changed_at,
+                    next_due_at = excluded.next_due_at,
+                    last_synced_at = excluded.last_synced_at
+                """,
+                [(*entry, now) for entry in entries]
+            )
+
+    def next_due_times(self):
+        """Return when each client row is next due to be polled, keyed by row_id."""
+        with self._lock:
+            rows = self._conn.execute("SELECT row_id, next_due_at FROM client_state ORDER BY next_due_at").fetchall()
+        return dict(rows)
+
+    def load_doc_failures(self):
+        """Return the failure record of every failing student doc, keyed by doc id."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT student_doc_id, failures, last_error, quarantined_until FROM doc_failures"
+            ).fetchall()
+        return {
+            row[0]: {'failures': row[1], 'last_error': row[2], 'quarantined_until': row[3]}
+            for row in rows
+        }
+
+    def save_doc_failure(self, student_doc_id, failures, last_error, quarantined_until):
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO doc_failures (student_doc_id, failures, last_error, quarantined_until)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(student_doc_id) DO UPDATE SET
+                    failures = excluded.failures,
+                    last_error = excluded.last_error,
+                    quarantined_until = excluded.quarantined_until
+                """,
+                (student_doc_id, failures, last_error, quarantined_until)
+            )
+
+    def clear_doc_failure(self, student_doc_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM doc_failures WHERE student_doc_id = ?", (student_doc_id,))
+
+    def get_sync_token(self, table_key):
+        """The sync token saved for a table by its last complete scan, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sync_token FROM table_sync_tokens WHERE table_key = ?", (table_key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_sync_token(self, table_key, sync_token):
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO table_sync_tokens (table_key, sync_token, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(table_key) DO UPDATE SET
+                    sync_token = excluded.sync_token,
+                    updated_at = excluded.updated_at
+                """,
+                (table_key, sync_token, time.time())
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
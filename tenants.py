@@ -0,0 +1,189 @@
+import json
+import time
+import logging
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+from concurrent.futures import ThreadPoolExecutor
+from metrics import PASS_SECONDS, LAST_PASS_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT_NAME = "default"
+
+
+class TenantColumns(BaseModel):
+    """Column ids of a tenant's Clients table."""
+    client_doc_id: str = Field(..., description="Column holding the student's document ID")
+    sentences_table: str = Field(..., description="Column holding the student's sentences table ID")
+    num_sentences: str = Field(..., description="Column the sentence count is written to")
+    first_name: Optional[str] = Field(None, description="Student first name (not used by the sync)")
+    last_name: Optional[str] = Field(None, description="Student last name (not used by the sync)")
+    doc_url: Optional[str] = Field(None, description="URL of the student's document (not used by the sync)")
+
+
+class TenantAudio(BaseModel):
+    """Where a tenant's student sentences tables keep the text to pre-generate audio for, and how to voice it."""
+    sentence_column: str = Field(..., description="Column of the sentences table holding the sentence text")
+    language_column: Optional[str] = Field(None, description="Column holding each sentence's language code or name")
+    language_code: str = Field("en-US", description="Language used when the sentence has none")
+    gender: Literal['male', 'female'] = Field("female", description="Voice gender")
+    provider: Literal['elevenlabs', 'google', 'auto'] = Field("elevenlabs", description="Text-to-speech provider")
+
+
+class TenantConfig(BaseModel):
+    """One main doc whose Clients table is synced: a school, a cohort, ..."""
+    name: str = Field(..., description="Unique tenant name, used in logs, results and state keys")
+    main_doc_id: str = Field(..., description="Document containing the Clients table")
+    clients_table_id: str = Field(..., description="Clients table ID")
+    columns: TenantColumns
+    audio: Optional[TenantAudio] = Field(None, description="Pre-generate audio for new and changed sentences")
+
+    def row_key(self, row_id):
+        """Key of a Clients row in the shared state store and lease table."""
+        # Row ids are only unique within a table; the default tenant keeps bare ids for existing state
+        if self.name == DEFAULT_TENANT_NAME:
+            return row_id
+        return f"{self.name}/{row_id}"
+
+
+# The original single Clients table
+DEFAULT_TENANT = TenantConfig(
+    name=DEFAULT_TENANT_NAME,
+    main_doc_id="9omNdUhI4j",
+    clients_table_id="grid-PZqFjHZRk_",
+    columns=TenantColumns(
+        client_doc_id="c-jJ9R5VVvz0",
+        sentences_table="c-oN98cuRpc1",
+        num_sentences="c-JfGAyru56_",
+        first_name="c-B5jqLzoe_x",
+        last_name="c-_WlEd-pWCg",
+        doc_url="c-5b3Ye-Mf5S"
+    )
+)
+
+
+def load_tenants(path=None) -> List[TenantConfig]:
+    """
+    Load tenant configs from a JSON file holding a list of tenant objects.
+
+    Args:
+        path: Path of the file; the default tenant alone is returned when it is empty
+
+    Returns:
+        The tenants, in file order
+    """
+    if not path:
+        return [DEFAULT_TENANT]
+    with open(path) as f:
+        tenants = [TenantConfig(**entry) for entry in json.load(f)]
+    names = [tenant.name for tenant in tenants]
+    if not tenants or len(set(names)) != len(names):
+        raise ValueError(f"{path} must list at least one tenant, with unique names (got {names})")
+    return tenants
+
+
+class MultiTenantSync:
+    """
+    Runs the sentence count sync for several tenants in one process.
+
+    Each tenant has its own ``CodaAPI`` engine, but they all share one Coda
+    client (so one connection pool and one rate budget), one worker pool and
+    the same state store, breaker and lease manager. A pass interleaves the
+    tenants page by page, so a tenant with a huge Clients table cannot hold the
+    others back, and the tenant that goes first rotates from pass to pass.
+    Exposes the same sync methods as a single ``CodaAPI``.
+    """
+
+    def __init__(self, engines):
+        if not engines:
+            raise ValueError("At least one tenant engine is required")
+        self.engines = {engine.tenant.name: engine for engine in engines}
+        self._first = 0
+
+    # Settings shared by every tenant engine
+    @property
+    def max_workers(self):
+        return self.engine().max_workers
+
+    @property
+    def lease_manager(self):
+        return self.engine().lease_manager
+
+    @property
+    def circuit_breaker(self):
+        return self.engine().circuit_breaker
+
+    @property
+    def pregenerator(self):
+        return self.engine().pregenerator
+
+    def engine(self, tenant=None):
+        """The engine of the named tenant, or of the first tenant when no name is given."""
+        if tenant is None:
+            return next(iter(self.engines.values()))
+        try:
+            return self.engines[tenant]
+        except KeyError:
+            raise ValueError(f"Unknown tenant '{tenant}'")
+
+    def sync_clients_sentence_counts(self, max_workers=None, on_result=None):
+        """
+        Run one pass over every tenant.
+
+        Returns the counters summed over the tenants, the row samples of all of
+        them, and each tenant's own summary under ``tenants``.
+        """
+        engines = list(self.engines.values())
+        start = self._first % len(engines)
+        self._first += 1
+        engines = engines[start:] + engines[:start]
+
+        workers = max_workers or engines[0].max_workers
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        started = time.perf_counter()
+        tenant_results = {engine.tenant.name: engine._new_results() for engine in engines}
+        try:
+            # Every tenant reads its student docs with the same token, so one doc listing serves them all
+            doc_versions = engines[0]._probe_doc_versions() if engines[0].state_store else {}
+            passes = [
+                engine.iter_pass(tenant_results[engine.tenant.name], executor, on_result or engine.on_result,
+                                 doc_versions=doc_versions)
+                for engine in engines
+            ]
+            # Round-robin: one page of each tenant in turn until every tenant is done
+            while passes:
+                for sync_pass in list(passes):
+                    if next(sync_pass, StopIteration) is StopIteration:
+                        passes.remove(sync_pass)
+        finally:
+            if executor:
+                executor.shutdown()
+
+        elapsed = time.perf_counter() - started
+        PASS_SECONDS.observe(elapsed)
+        LAST_PASS_SECONDS.set(elapsed)
+        return self._merge(tenant_results, elapsed)
+
+    def sync_client(self, row_id=None, student_doc_id=None, tenant=None):
+        """Recount a single client of the given tenant (the first one by default)."""
+        return self.engine(tenant).sync_client(row_id=row_id, student_doc_id=student_doc_id)
+
+    def next_due_times(self):
+        due = {}
+        for engine in self.engines.values():
+            due.update(engine.next_due_times())
+        return due
+
+    @staticmethod
+    def _merge(tenant_results, elapsed):
+        """Sum the counters and concatenate the samples of each tenant's results; errors are keyed by tenant."""
+        merged = {'tenants': {}}
+        for name, results in tenant_results.items():
+            for key, value in results.items():
+                if key == 'error':
+                    merged.setdefault('error', {})[name] = value
+                elif key != 'duration_seconds':
+                    merged[key] = merged.get(key, type(value)()) + value
+            merged['tenants'][name] = {k: v for k, v in results.items() if not isinstance(v, list)}
+        merged['duration_seconds'] = round(elapsed, 3)
+        return merged
@@ -0,0 +1,90 @@
+"""Audio cache tests, with two caches standing in for two processes sharing a directory."""
+import io
+
+from services.audio_cache import AudioCache
+from services.audio_store import S3AudioStore
+
+
+def test_entry_written_by_another_process_is_a_hit(tmp_path):
+    web = AudioCache(str(tmp_path))
+    worker = AudioCache(str(tmp_path))
+    key = AudioCache.make_key("Bonjour.", "fr-FR", "female", "google", None, None)
+
+    assert web.get(key) is None
+    worker.put(key, b"mp3", {"provider": "google"})
+    assert web.get(key) == (b"mp3", {"provider": "google"})
+    assert web.stats()["hits"] == 1 and web.stats()["entries"] == 1
+
+
+def test_entry_evicted_by_another_process_is_a_miss(tmp_path):
+    web = AudioCache(str(tmp_path))
+    worker = AudioCache(str(tmp_path), max_bytes=4, rescan_seconds=0)
+    first = AudioCache.make_key("One.", "en-US", "female", "google", None, None)
+    second = AudioCache.make_key("Two.", "en-US", "female", "google", None, None)
+
+    worker.put(first, b"111")
+    assert web.get(first) is not None
+    worker.put(second, b"222")
+    assert web.get(first) is None
+    assert web.stats()["entries"] == 0
+
+
+def test_writer_counts_entries_written_elsewhere(tmp_path):
+    web = AudioCache(str(tmp_path), max_bytes=8, rescan_seconds=0)
+    worker = AudioCache(str(tmp_path), max_bytes=8, rescan_seconds=0)
+    keys = [AudioCache.make_key(f"Sentence {i}.", "en-US", "female", "google", None, None) for i in range(3)]
+
+    worker.put(keys[0], b"000")
+    worker.put(keys[1], b"111")
+    web.put(keys[2], b"222")
+    # The directory as a whole stays within max_bytes, the oldest entry goes
+    assert web.stats()["bytes"] <= 8
+    assert AudioCache(str(tmp_path)).get(keys[0]) is None
+    assert AudioCache(str(tmp_path)).get(keys[2]) == (b"222", {})
+
+
+class FakeS3:
+    """The two S3 client calls the audio store makes, backed by a dict."""
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self):
+        self.objects = {}
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise self.exceptions.NoSuchKey(Key)
+        body, metadata = self.objects[(Bucket, Key)]
+        return {"Body": io.BytesIO(body), "Metadata": metadata}
+
+    def put_object(self, Bucket, Key, Body, ContentType, Metadata):
+        self.objects[(Bucket, Key)] = (Body, Metadata)
+
+
+def test_processes_without_a_shared_directory_share_through_the_store(tmp_path):
+    store = S3AudioStore("audio", client=FakeS3())
+    worker = AudioCache(str(tmp_path / "worker"), store=store)
+    web = AudioCache(str(tmp_path / "web"), store=store)
+    key = AudioCache.make_key("Hola.", "es-ES", "male", "elevenlabs", "v1", "m1")
+
+    assert web.get(key) is None
+    worker.put(key, b"mp3", {"voice_id": "v1"})
+    assert web.get(key) == (b"mp3", {"voice_id": "v1"})
+    # Kept locally from then on
+    assert web.get(key) == (b"mp3", {"voice_id": "v1"})
+    assert web.stats()["store_hits"] == 1 and web.stats()["hits"] == 2 and web.stats()["misses"] == 1
+
+
+def test_contains_counts_nothing_and_copies_store_entries(tmp_path):
+    store = S3AudioStore("audio", client=FakeS3())
+    key = AudioCache.make_key("Hola.", "es-ES", "male", "google", None, None)
+    AudioCache(str(tmp_path / "worker"), store=store).put(key, b"mp3")
+    web = AudioCache(str(tmp_path / "web"), store=store)
+
+    assert web.contains(key)
+    assert not web.contains(AudioCache.make_key("Adiós.", "es-ES", "male", "google", None, None))
+    assert web.stats()["hits"] == 0 and web.stats()["misses"] == 0
+    web.store = None
+    assert web.get(key) == (b"mp3", {})
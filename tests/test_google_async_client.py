@@ -0,0 +1,43 @@
+"""Lifecycle of the per-event-loop Google async client."""
+import asyncio
+
+import pytest
+
+from services import text_to_speech_service
+from services.text_to_speech_service import TextToSpeechService
+
+
+class FakeAsyncClient:
+    instances = []
+
+    def __init__(self):
+        self.closed = False
+        self.transport = self
+        FakeAsyncClient.instances.append(self)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv('TTS_CACHE_DISABLED', '1')
+    monkeypatch.delenv('ELEVENLABS_API_KEY', raising=False)
+    monkeypatch.setattr(text_to_speech_service.texttospeech, 'TextToSpeechAsyncClient', FakeAsyncClient)
+    FakeAsyncClient.instances = []
+    return TextToSpeechService()
+
+
+def test_one_client_per_loop_closed_when_the_loop_shuts_down(service):
+    async def use_twice():
+        first = await service._google_async_client()
+        second = await service._google_async_client()
+        assert first is second
+        assert not first.closed
+
+    for _ in range(3):
+        asyncio.run(use_twice())
+
+    assert len(FakeAsyncClient.instances) == 3
+    assert all(client.closed for client in FakeAsyncClient.instances)
+    assert service._google_async_clients == {}
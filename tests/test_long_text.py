@@ -0,0 +1,18 @@
+"""Sentence-aligned chunking of long text."""
+from services.long_text import split_text
+
+
+def test_closing_quotes_and_brackets_stay_with_their_sentence():
+    text = 'He said "Stop." Then (he left.) She asked: "Why?") Done!'
+    assert split_text(text, 20) == ['He said "Stop."', 'Then (he left.)', 'She asked: "Why?")', 'Done!']
+
+
+def test_spaced_french_quotes_stay_with_their_sentence():
+    text = "Il a dit « Bonjour. » Puis « Au revoir ! » Fin."
+    assert split_text(text, 25) == ["Il a dit « Bonjour. »", "Puis « Au revoir ! » Fin."]
+
+
+def test_sentences_are_packed_and_long_ones_split_on_clauses():
+    assert split_text("One. Two. Three.", 10) == ["One. Two.", "Three."]
+    assert split_text("First clause, second clause.", 15) == ["First clause,", "second clause."]
+    assert split_text("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
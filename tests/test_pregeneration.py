@@ -0,0 +1,104 @@
+"""Audio pre-generation tests, against the fake Coda client and a stand-in text-to-speech service."""
+import threading
+from types import SimpleNamespace
+
+from benchmarks.fake_coda import FakeCoda
+from pregeneration import AudioPregenerator
+from sync_state import SyncStateStore
+from tenants import TenantAudio
+
+AUDIO = TenantAudio(sentence_column="c-text", language_code="fr-FR")
+TABLE_KEY = "doc-0/grid-sentences"
+
+
+class FakeTTS:
+    """Records the texts it was asked for; fails those in ``failing`` and blocks while ``gate`` is clear."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.texts = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def process(self, request):
+        self.gate.wait(5)
+        self.texts.append(request.text)
+        if request.text in self.failing:
+            raise RuntimeError("No suitable voice found")
+        return SimpleNamespace(cached=False)
+
+
+def make_fake():
+    fake = FakeCoda()
+    fake.add_table("doc-0", "grid-sentences", [
+        {"id": f"s{i}", "values": {"c-text": f"Phrase {i}."}} for i in range(3)
+    ])
+    return fake
+
+
+def scan(pregenerator, fake):
+    queued = pregenerator.scan(fake, AUDIO, "doc-0", "grid-sentences")
+    pregenerator.join()
+    return queued
+
+
+def test_token_advances_once_all_sentences_are_synthesized(tmp_path):
+    fake, tts = make_fake(), FakeTTS()
+    store = SyncStateStore(str(tmp_path / "state.db"))
+    pregenerator = AudioPregenerator(store, tts)
+
+    tts.gate.clear()
+    assert pregenerator.scan(fake, AUDIO, "doc-0", "grid-sentences") == 3
+    # Queued but not synthesized yet: a restart now must list the rows again
+    assert store.get_sync_token(TABLE_KEY) is None
+    tts.gate.set()
+    pregenerator.join()
+    assert store.get_sync_token(TABLE_KEY)
+
+    fake.edit_row("doc-0", "grid-sentences", "s1", {"c-text": "Phrase changée."})
+    assert scan(pregenerator, fake) == 1
+    assert tts.texts[-1] == "Phrase changée."
+    assert pregenerator.stats()["tables_pending"] == 0
+
+
+def test_failed_sentences_are_queued_again_next_scan(tmp_path):
+    fake, tts = make_fake(), FakeTTS(failing={"Phrase 1."})
+    store = SyncStateStore(str(tmp_path / "state.db"))
+    pregenerator = AudioPregenerator(store, tts)
+
+    assert scan(pregenerator, fake) == 3
+    assert store.get_sync_token(TABLE_KEY) is None
+    assert pregenerator.stats()["failed"] == 1
+
+    tts.failing.clear()
+    assert scan(pregenerator, fake) == 3
+    assert tts.texts.count("Phrase 1.") == 2
+    assert store.get_sync_token(TABLE_KEY)
+    assert scan(pregenerator, fake) == 0
+
+
+def test_full_queue_keeps_the_token(tmp_path):
+    fake, tts = make_fake(), FakeTTS()
+    store = SyncStateStore(str(tmp_path / "state.db"))
+    pregenerator = AudioPregenerator(store, tts, max_queued=1)
+
+    tts.gate.clear()
+    pregenerator.scan(fake, AUDIO, "doc-0", "grid-sentences")
+    tts.gate.set()
+    pregenerator.join()
+    assert pregenerator.stats()["dropped"] >= 1
+    assert store.get_sync_token(TABLE_KEY) is None
+
+
+def test_sentence_failing_every_time_is_given_up_on(tmp_path):
+    fake, tts = make_fake(), FakeTTS(failing={"Phrase 1."})
+    store = SyncStateStore(str(tmp_path / "state.db"))
+    pregenerator = AudioPregenerator(store, tts, max_attempts=2)
+
+    assert scan(pregenerator, fake) == 3
+    assert store.get_sync_token(TABLE_KEY) is None
+    assert scan(pregenerator, fake) == 3
+    # Second failure in a row: the sentence no longer holds the table back
+    assert store.get_sync_token(TABLE_KEY)
+    assert pregenerator.stats()["abandoned"] == 1
+    assert scan(pregenerator, fake) == 0
@@ -0,0 +1,26 @@
+"""Sync metrics tests, against the fake Coda client."""
+from benchmarks.fake_coda import build_fake
+from coda_api import CodaAPI
+from metrics import ROWS
+from sync_state import SyncStateStore
+
+OUTCOMES = ('updated', 'unchanged', 'skipped', 'not_due', 'quarantined', 'error')
+
+
+def rows_counted(tenant):
+    return {outcome: ROWS.value(outcome=outcome, tenant=tenant) for outcome in OUTCOMES}
+
+
+def test_each_row_is_counted_under_one_outcome():
+    api = CodaAPI(None, client=build_fake(20, sentences_per_client=2), state_store=SyncStateStore(":memory:"))
+    tenant = api.tenant.name
+    before = rows_counted(tenant)
+    api.sync_clients_sentence_counts()
+    # Nothing changed: the docs are skipped on their version
+    results = api.sync_clients_sentence_counts()
+    assert results['docs_skipped'] == 20
+
+    after = rows_counted(tenant)
+    delta = {outcome: after[outcome] - before[outcome] for outcome in OUTCOMES}
+    assert sum(delta.values()) == 40
+    assert delta['skipped'] == 20 and delta['unchanged'] == 0
@@ -0,0 +1,43 @@
+"""Count write-back tests, against the fake Coda client."""
+from benchmarks.fake_coda import FakeCoda, build_fake, MAIN_DOC_ID, CLIENTS_TABLE_ID
+from coda_api import CodaAPI
+
+
+class DeletingFakeCoda(FakeCoda):
+    """Deletes a Clients row right before the first upsert, as a user could during a pass."""
+
+    deleted_row = "i-00003"
+
+    def upsert_row(self, doc_id, table_id_or_name, data):
+        if self.deleted_row:
+            self.delete_row(doc_id, table_id_or_name, self.deleted_row)
+            self.deleted_row = None
+        return super().upsert_row(doc_id, table_id_or_name, data)
+
+
+def clients(fake):
+    return fake.tables[(MAIN_DOC_ID, CLIENTS_TABLE_ID)]
+
+
+def test_counts_are_upserted_in_batches():
+    fake = build_fake(10, sentences_per_client=2)
+    api = CodaAPI(None, client=fake, upsert_batch_size=4)
+    results = api.sync_clients_sentence_counts()
+    assert results['rows_updated'] == 10 and results['errors'] == 0
+    assert fake.calls['upsert_row'] == 3 and fake.calls['update_row'] == 0
+    assert all(row['values'][api.COL_NUM_SENTENCES] is not None for row in clients(fake))
+
+
+def test_row_deleted_during_the_pass_is_not_recreated():
+    source = build_fake(10, sentences_per_client=2)
+    fake = DeletingFakeCoda()
+    fake.tables = source.tables
+    fake.doc_versions = source.doc_versions
+    api = CodaAPI(None, client=fake)
+
+    api.sync_clients_sentence_counts()
+    rows = clients(fake)
+    assert len(rows) == 9
+    assert "i-00003" not in {row['id'] for row in rows}
+    assert all(row['values'].get(api.COL_SENTENCES_TABLE) for row in rows)
+    assert fake.calls['get_mutation_status'] >= 1
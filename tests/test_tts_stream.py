@@ -0,0 +1,63 @@
+"""/tts/stream endpoint tests, with a stand-in text-to-speech service."""
+import pytest
+
+from app import create_app
+from benchmarks.fake_coda import FakeCoda
+from coda_api import CodaAPI
+
+REQUEST = {'text': "Bonjour tout le monde.", 'language_code': 'fr-FR', 'provider': 'google'}
+
+
+class FakeTTS:
+    def __init__(self):
+        self.requests = []
+
+    def stream(self, request):
+        self.requests.append(request)
+        return iter([b"ID3", b"audio"])
+
+
+@pytest.fixture
+def tts():
+    return FakeTTS()
+
+
+@pytest.fixture
+def client(tts, monkeypatch):
+    monkeypatch.setenv('WEBHOOK_SECRET', 's3cret')
+    monkeypatch.setenv('TTS_MAX_TEXT_CHARS', '100')
+    app = create_app(engine=CodaAPI(None, client=FakeCoda()), tts_service=tts)
+    yield app.test_client()
+    app.config['WEBHOOK_DISPATCHER'].stop()
+
+
+SECRET = {'X-Webhook-Secret': 's3cret'}
+
+
+def test_stream_needs_the_secret(client, tts):
+    assert client.post('/tts/stream', json=REQUEST).status_code == 401
+    response = client.post('/tts/stream', json=REQUEST, headers=SECRET)
+    assert response.status_code == 200
+    assert response.data == b"ID3audio"
+    assert tts.requests[0].text == REQUEST['text']
+
+
+def test_stream_rejects_long_and_invalid_requests(client, tts):
+    response = client.post('/tts/stream', json=dict(REQUEST, text="x" * 101), headers=SECRET)
+    assert response.status_code == 413
+    assert client.post('/tts/stream', json=dict(REQUEST, gender='MALE'), headers=SECRET).status_code == 400
+    assert client.get('/tts/stream', query_string=REQUEST).status_code == 405
+    assert tts.requests == []
+
+
+def test_token_url_plays_the_request_without_the_secret(client, tts):
+    assert client.post('/tts/stream/token', json=REQUEST).status_code == 401
+    response = client.post('/tts/stream/token', json=REQUEST, headers=SECRET)
+    assert response.status_code == 201
+    url = response.get_json()['url']
+    assert REQUEST['text'] not in url
+
+    # Browsers may fetch media more than once
+    assert client.get(url).data == b"ID3audio"
+    assert client.get(url).data == b"ID3audio"
+    assert client.get('/tts/stream/not-a-token').status_code == 404
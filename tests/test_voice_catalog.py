@@ -0,0 +1,28 @@
+"""Voice catalog tests with an in-memory voice list."""
+import time
+from types import SimpleNamespace
+
+from services.voice_catalog import VoiceCatalog
+
+VOICES = [SimpleNamespace(voice_id="v-fr", labels={"language": "fr", "gender": "female"})]
+
+
+def test_warm_waits_for_the_first_fetch():
+    def fetch():
+        time.sleep(0.1)
+        return VOICES
+
+    catalog = VoiceCatalog(fetch)
+    assert catalog.warm(timeout=5)
+    assert catalog.lookup("fr-FR", "female") == "v-fr"
+
+
+def test_warm_returns_once_the_first_fetch_failed():
+    def fetch():
+        raise RuntimeError("unauthorized")
+
+    catalog = VoiceCatalog(fetch, retry_interval=60)
+    started = time.monotonic()
+    assert not catalog.warm(timeout=5)
+    assert not catalog.warm(timeout=5)
+    assert time.monotonic() - started < 1
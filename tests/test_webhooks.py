@@ -0,0 +1,150 @@
+"""Webhook endpoint and dispatcher tests, run against the in-memory fake Coda client."""
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app import create_app
+from benchmarks.fake_coda import FakeCoda, MAIN_DOC_ID, CLIENTS_TABLE_ID
+from coda_api import CodaAPI
+from tenants import DEFAULT_TENANT
+from webhooks import WebhookDispatcher
+
+COLUMNS = DEFAULT_TENANT.columns
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def fake():
+    """Two clients whose student docs hold 3 and 5 sentences; no counts written yet."""
+    fake = FakeCoda()
+    clients = []
+    for i, sentences in enumerate((3, 5)):
+        fake.add_table(f"doc-{i}", "grid-sentences", [{"id": f"s{j}", "values": {}} for j in range(sentences)])
+        clients.append({"id": f"i-{i}", "values": {
+            COLUMNS.client_doc_id: f"doc-{i}",
+            COLUMNS.sentences_table: "grid-sentences",
+            COLUMNS.num_sentences: None
+        }})
+    fake.add_table(MAIN_DOC_ID, CLIENTS_TABLE_ID, clients)
+    return fake
+
+
+def count_of(fake, row_id):
+    row = next(row for row in fake.tables[(MAIN_DOC_ID, CLIENTS_TABLE_ID)] if row["id"] == row_id)
+    return row["values"][COLUMNS.num_sentences]
+
+
+@pytest.fixture
+def client(fake, monkeypatch):
+    monkeypatch.setenv('WEBHOOK_DEBOUNCE_SECONDS', '0.05')
+    monkeypatch.delenv('WEBHOOK_SECRET', raising=False)
+    app = create_app(engine=CodaAPI(None, client=fake))
+    yield app.test_client()
+    app.config['WEBHOOK_DISPATCHER'].stop()
+
+
+def test_dispatcher_coalesces_repeated_triggers():
+    handled = []
+    dispatcher = WebhookDispatcher(handled.append, debounce_seconds=0.1, max_delay_seconds=1)
+    try:
+        assert dispatcher.submit(('row', 'i-0', None))
+        assert not dispatcher.submit(('row', 'i-0', None))
+        assert dispatcher.submit(('row', 'i-1', None))
+        # Nothing runs before the quiet period is over
+        assert handled == []
+        wait_for(lambda: dispatcher.stats()['dispatched'] == 2)
+        assert sorted(handled) == [('row', 'i-0', None), ('row', 'i-1', None)]
+        assert dispatcher.stats()['coalesced'] == 1
+    finally:
+        dispatcher.stop()
+
+
+def test_dispatcher_runs_a_trigger_storm_by_its_max_delay():
+    handled = []
+    dispatcher = WebhookDispatcher(handled.append, debounce_seconds=0.2, max_delay_seconds=0.3)
+    try:
+        started = time.monotonic()
+        # Re-triggered faster than the debounce, so only the max delay lets it through
+        while not handled and time.monotonic() - started < 2:
+            dispatcher.submit(('doc', 'doc-0', None))
+            time.sleep(0.05)
+        assert handled == [('doc', 'doc-0', None)]
+        assert time.monotonic() - started < 1
+    finally:
+        dispatcher.stop()
+
+
+def test_sync_client_by_row_and_by_doc(fake):
+    engine = CodaAPI(None, client=fake)
+
+    result = engine.sync_client(row_id="i-0")
+    assert result['errors'] == 0 and result['rows_updated'] == 1
+    assert count_of(fake, "i-0") == 3
+    assert count_of(fake, "i-1") is None
+
+    result = engine.sync_client(student_doc_id="doc-1")
+    assert result['errors'] == 0 and result['rows_updated'] == 1
+    assert count_of(fake, "i-1") == 5
+
+
+def test_sync_client_reports_unknown_doc(fake):
+    result = CodaAPI(None, client=fake).sync_client(student_doc_id="doc-missing")
+    assert result['errors'] == 1
+    assert "doc-missing" in result['error']
+    with pytest.raises(ValueError):
+        CodaAPI(None, client=fake).sync_client()
+
+
+def test_webhook_recounts_client_by_row(client, fake):
+    response = client.post('/webhook/client', json={'row_id': 'i-0'})
+    assert response.status_code == 202
+    assert response.get_json() == {'status': 'queued'}
+    wait_for(lambda: count_of(fake, "i-0") == 3)
+    assert count_of(fake, "i-1") is None
+
+
+def test_webhook_recounts_client_by_doc_and_coalesces(client, fake):
+    assert client.post('/webhook/client', json={'student_doc_id': 'doc-1'}).get_json() == {'status': 'queued'}
+    assert client.post('/webhook/client', json={'student_doc_id': 'doc-1'}).get_json() == {'status': 'coalesced'}
+    wait_for(lambda: count_of(fake, "i-1") == 5)
+    stats = client.get('/webhook/stats').get_json()
+    assert stats['received'] == 2 and stats['coalesced'] == 1 and stats['dispatched'] == 1
+
+
+def test_webhook_rejects_bad_requests(client):
+    assert client.post('/webhook/client', json={}).status_code == 400
+    assert client.post('/webhook/client', data="not json").status_code == 400
+    response = client.post('/webhook/client', json={'row_id': 'i-0', 'tenant': 'nobody'})
+    assert response.status_code == 400
+    assert "nobody" in response.get_json()['error']
+
+
+def test_webhook_secret(fake, monkeypatch):
+    monkeypatch.setenv('WEBHOOK_SECRET', 's3cret')
+    app = create_app(engine=CodaAPI(None, client=fake))
+    client = app.test_client()
+    try:
+        assert client.post('/webhook/client', json={'row_id': 'i-0'}).status_code == 401
+        response = client.post('/webhook/client', json={'row_id': 'i-0'}, headers={'X-Webhook-Secret': 'wrong'})
+        assert response.status_code == 401
+        response = client.post('/webhook/client', json={'row_id': 'i-0'}, headers={'X-Webhook-Secret': 's3cret'})
+        assert response.status_code == 202
+    finally:
+        app.config['WEBHOOK_DISPATCHER'].stop()
+
+
+def test_importing_app_builds_nothing(tmp_path):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=tmp_path, env=env, check=True)
+    assert not (tmp_path / "sync_state.db").exists()
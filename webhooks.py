@@ -0,0 +1,98 @@
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Quiet period after the last trigger for a key before it is handled
+DEFAULT_DEBOUNCE_SECONDS = 5.0
+# Upper bound on how long a continuously re-triggered key can be held back
+DEFAULT_MAX_DELAY_SECONDS = 30.0
+
+
+class WebhookDispatcher:
+    """
+    Debounces and coalesces webhook triggers before handing them to a handler.
+
+    Triggers are identified by a hashable key (e.g. ``('row', row_id)``). Repeated
+    triggers for a key that is already pending are folded into one call, which
+    runs once the key has been quiet for ``debounce_seconds`` (or, during a
+    storm, at most ``max_delay_seconds`` after its first trigger). Keys are
+    handled one at a time on a background thread.
+    """
+
+    def __init__(self, handler, debounce_seconds=DEFAULT_DEBOUNCE_SECONDS,
+                 max_delay_seconds=DEFAULT_MAX_DELAY_SECONDS):
+        self.handler = handler
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max(debounce_seconds, max_delay_seconds)
+        self._pending = {}  # key -> (first_seen, last_seen)
+        self._cond = threading.Condition()
+        self._stopped = False
+        self.received = 0
+        self.coalesced = 0
+        self.dispatched = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name="webhook-dispatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, key):
+        """Queue ``key`` for handling. Returns False if it was merged into a pending trigger."""
+        now = time.monotonic()
+        with self._cond:
+            self.received += 1
+            if key in self._pending:
+                first_seen, _ = self._pending[key]
+                self._pending[key] = (first_seen, now)
+                self.coalesced += 1
+                return False
+            self._pending[key] = (now, now)
+            self._cond.notify()
+            return True
+
+    def _deadline(self, first_seen, last_seen):
+        return min(last_seen + self.debounce_seconds, first_seen + self.max_delay_seconds)
+
+    def _next_due(self):
+        """Pop a key whose deadline has passed, or return (None, seconds to wait)."""
+        now = time.monotonic()
+        wait = None
+        for key, (first_seen, last_seen) in self._pending.items():
+            deadline = self._deadline(first_seen, last_seen)
+            if deadline <= now:
+                del self._pending[key]
+                return key, 0
+            wait = deadline - now if wait is None else min(wait, deadline - now)
+        return None, wait
+
+    def _run(self):
+        while True:
+            with self._cond:
+                key, wait = self._next_due()
+                while key is None and not self._stopped:
+                    self._cond.wait(timeout=wait)
+                    key, wait = self._next_due()
+                if self._stopped:
+                    return
+            try:
+                self.handler(key)
+                self.dispatched += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Webhook handler failed for {key}: {e}")
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'received': self.received,
+                'coalesced': self.coalesced,
+                'dispatched': self.dispatched,
+                'failed': self.failed,
+                'pending': len(self._pending)
+            }